@@ -1,35 +1,148 @@
 from __future__ import annotations
 
-import json
 import re
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
+from .fast import json_loads
 
-def apply_corrections(text: str, corrections_path: Path | None) -> str:
-    """Apply optional corrections.
+# Minimal generic fixes (avoid personalization here)
+GENERIC_REGEX: list[tuple[str, str]] = [
+    (r"\btered\b", "tired"),
+    (r"\bliet\b", "diet"),
+]
 
-    Supports:
-    1) JSON dict: {"wrong": "right"} (word-boundary, case-insensitive)
-    2) JSON list: [["<regex>", "<replacement>"], ...] (applied in order)
 
-    Also applies a tiny generic baseline (safe fixes only).
+# A rule whose pattern is exactly \bWORD\b (WORD all word characters) only
+# ever matches whole \w+ runs, so a run of such rules can be applied with one
+# scan over the words of the text and a dict lookup.
+_WORD_RULE_RE = re.compile(r"\\b(\w+)\\b")
+_WORD_RUN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class _WordTable:
+    """Consecutive whole-word literal rules, applied in a single pass."""
+
+    table: dict[str, str]  # lowercased ASCII word -> replacement
+    merged: re.Pattern[str]  # exact per-rule match for non-ASCII words
+    repls: tuple[str, ...]
+
+    def _replace(self, m: re.Match[str]) -> str:
+        word = m.group(0)
+        if word.isascii():
+            return self.table.get(word.lower(), word)
+        # IGNORECASE also folds a few non-ASCII letters onto ASCII ones
+        # (e.g. KELVIN SIGN -> k); let the regex engine decide those.
+        fm = self.merged.fullmatch(word)
+        return word if fm is None else self.repls[int(fm.lastgroup[1:])]
+
+    def sub(self, text: str) -> str:
+        return _WORD_RUN_RE.sub(self._replace, text)
+
+
+def _word_rule_stem(patt: re.Pattern[str], repl: str) -> str | None:
+    m = _WORD_RULE_RE.fullmatch(patt.pattern)
+    if m is None or not m.group(1).isascii() or "\\" in repl:
+        return None
+    if patt.flags & ~re.UNICODE != re.IGNORECASE:
+        return None
+    return m.group(1)
+
+
+def _build_word_table(group: list[tuple[str, str]]) -> _WordTable:
+    return _WordTable(
+        table={stem.lower(): repl for stem, repl in group},
+        merged=re.compile(
+            "|".join(f"(?P<r{i}>{stem})" for i, (stem, _) in enumerate(group)),
+            flags=re.IGNORECASE,
+        ),
+        repls=tuple(repl for _, repl in group),
+    )
+
+
+def _plan_steps(
+    rules: tuple[tuple[re.Pattern[str], str], ...],
+) -> tuple[tuple[re.Pattern[str], str] | _WordTable, ...]:
+    """Fold runs of whole-word literal rules into _WordTables.
+
+    Applying such a run in one pass equals applying it rule by rule as long
+    as no rule can match text produced by an earlier rule of the same run:
+    matches are whole words, so they never overlap, and a replacement can only
+    create new words inside itself. A rule that breaks that (or a duplicate
+    word) starts a new run.
     """
-    out = text
+    steps: list[tuple[re.Pattern[str], str] | _WordTable] = []
+    group: list[tuple[str, str]] = []
+    group_rules: list[tuple[re.Pattern[str], str]] = []
+
+    def flush() -> None:
+        if len(group) > 1:
+            steps.append(_build_word_table(group))
+        else:
+            steps.extend(group_rules)
+        group.clear()
+        group_rules.clear()
+
+    for patt, repl in rules:
+        stem = _word_rule_stem(patt, repl)
+        if stem is None:
+            flush()
+            steps.append((patt, repl))
+            continue
+        if any(patt.search(s) or patt.search(r) for s, r in group):
+            flush()
+        group.append((stem, repl))
+        group_rules.append((patt, repl))
+    flush()
+    return tuple(steps)
+
+
+@dataclass(frozen=True)
+class CompiledCorrections:
+    """Pre-compiled correction rules, applied in order."""
 
-    # Minimal generic fixes (avoid personalization here)
-    generic_regex: list[tuple[str, str]] = [
-        (r"\btered\b", "tired"),
-        (r"\bliet\b", "diet"),
+    rules: tuple[tuple[re.Pattern[str], str], ...]
+    steps: tuple[tuple[re.Pattern[str], str] | _WordTable, ...] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "steps", _plan_steps(self.rules))
+
+
+def load_corrections(corrections_path: Path | None) -> CompiledCorrections:
+    """Load and compile a corrections map once, for reuse across many texts.
+
+    Accepts the same formats as apply_corrections(). The generic baseline
+    rules are always included (first). Results are cached per file
+    (inode, size, mtime), so repeated loads of an unchanged map are free.
+    """
+    try:
+        st = corrections_path.stat() if corrections_path else None
+    except FileNotFoundError:
+        st = None
+    if st is None:
+        return _load_corrections_cached(None, None)
+    return _load_corrections_cached(
+        str(corrections_path), (st.st_ino, st.st_size, st.st_mtime_ns)
+    )
+
+
+@lru_cache(maxsize=8)
+def _load_corrections_cached(
+    path: str | None, _stat_key: tuple[int, int, int] | None
+) -> CompiledCorrections:
+    rules: list[tuple[re.Pattern[str], str]] = [
+        (re.compile(patt, flags=re.IGNORECASE), repl) for patt, repl in GENERIC_REGEX
     ]
-    for patt, repl in generic_regex:
-        out = re.sub(patt, repl, out, flags=re.IGNORECASE)
 
-    if not corrections_path:
-        return out
-    if not corrections_path.exists():
-        return out
+    if path is None:
+        return CompiledCorrections(rules=tuple(rules))
 
-    obj = json.loads(corrections_path.read_text(encoding="utf-8"))
+    data = Path(path).read_bytes()
+    obj = json_loads(data)
 
     # Regex list
     if isinstance(obj, list):
@@ -37,17 +150,43 @@ def apply_corrections(text: str, corrections_path: Path | None) -> str:
             if not (isinstance(item, (list, tuple)) and len(item) == 2):
                 continue
             patt, repl = item
-            out = re.sub(str(patt), str(repl), out, flags=re.IGNORECASE)
-        return out
+            rules.append((re.compile(str(patt), flags=re.IGNORECASE), str(repl)))
 
     # Dict mapping
-    if isinstance(obj, dict):
+    elif isinstance(obj, dict):
         for wrong in sorted(obj.keys(), key=lambda s: len(str(s)), reverse=True):
             right = obj[wrong]
             wrong_s = str(wrong).strip()
             if not wrong_s:
                 continue
             patt = re.compile(rf"\b{re.escape(wrong_s)}\b", flags=re.IGNORECASE)
-            out = patt.sub(str(right), out)
+            rules.append((patt, str(right)))
+
+    return CompiledCorrections(rules=tuple(rules))
+
 
+def apply_corrections_compiled(text: str, compiled: CompiledCorrections) -> str:
+    """Apply corrections previously loaded with load_corrections()."""
+    out = text
+    for step in compiled.steps:
+        if isinstance(step, _WordTable):
+            out = step.sub(out)
+        else:
+            patt, repl = step
+            out = patt.sub(repl, out)
     return out
+
+
+def apply_corrections(text: str, corrections_path: Path | None) -> str:
+    """Apply optional corrections.
+
+    Supports:
+    1) JSON dict: {"wrong": "right"} (word-boundary, case-insensitive)
+    2) JSON list: [["<regex>", "<replacement>"], ...] (applied in order)
+
+    Also applies a tiny generic baseline (safe fixes only).
+
+    This re-reads the map on every call; when correcting many texts, use
+    load_corrections() once and apply_corrections_compiled().
+    """
+    return apply_corrections_compiled(text, load_corrections(corrections_path))
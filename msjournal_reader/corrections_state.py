@@ -0,0 +1,40 @@
+"""Per-doc sidecar recording exported pages already up to date with a corrections map.
+
+Layout: {"corrections_hash": ..., "pages": {"page_0001.md": [size, mtime_ns]}}.
+An entry means the page has OCR text and re-applying the corrections map with
+that hash leaves it unchanged, so it can be skipped without reading it while
+its size/mtime still match.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from .fast import json_dumpb, json_loads, new_hasher
+
+STATE_NAME = ".corrections_state.json"
+
+
+def corrections_hash(corr_path: Path) -> str:
+    h = new_hasher()
+    if corr_path.exists():
+        h.update(corr_path.read_bytes())
+    return h.hexdigest()
+
+
+def load_doc_state(doc_dir: Path) -> dict:
+    try:
+        obj = json_loads((doc_dir / STATE_NAME).read_bytes())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def save_doc_state(doc_dir: Path, state: dict) -> None:
+    (doc_dir / STATE_NAME).write_bytes(json_dumpb(state) + b"\n")
+
+
+def page_state_matches(state: dict, md: Path, st: os.stat_result) -> bool:
+    return (state.get("pages") or {}).get(md.name) == [st.st_size, st.st_mtime_ns]
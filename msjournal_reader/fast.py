@@ -0,0 +1,41 @@
+"""Optional speedups from the ``fast`` extra, with stdlib fallbacks.
+
+orjson (when installed) parses/serialises JSON; BLAKE3 (when installed)
+hashes file contents. HASH_ALGO names the hash actually in use so callers
+that persist digests can invalidate them when it changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    from blake3 import blake3 as new_hasher  # type: ignore
+
+    HASH_ALGO = "blake3"
+except ImportError:
+    new_hasher = hashlib.md5
+    HASH_ALGO = "md5"
+
+
+def json_loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumpb(obj, *, indent: bool = False) -> bytes:
+    """Serialise *obj* to UTF-8 JSON bytes (2-space indent if *indent*)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def json_dumps(obj, *, indent: bool = False) -> str:
+    return json_dumpb(obj, indent=indent).decode("utf-8")
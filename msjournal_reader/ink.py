@@ -7,6 +7,13 @@ from pathlib import Path
 PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
 
 
+def _connect_readonly(db_path: Path) -> sqlite3.Connection:
+    """Open a .ink file read-only (never creates or writes the journal DB)."""
+    con = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    con.row_factory = sqlite3.Row
+    return con
+
+
 @dataclass(frozen=True)
 class InkPage:
     order: int
@@ -21,23 +28,26 @@ def extract_pages_png(db_path: Path) -> list[InkPage]:
     - pages.id (BLOB) + pages.page_order
     - blobs.owner_id == pages.id, blobs.ordinal == 0 holds a PNG render
     """
-    con = sqlite3.connect(str(db_path))
-    con.row_factory = sqlite3.Row
+    con = _connect_readonly(db_path)
     cur = con.cursor()
 
     cur.execute("SELECT id, page_order FROM pages ORDER BY page_order")
     pages = cur.fetchall()
 
+    # Plain tuples for the per-page blob read, not sqlite3.Row.
+    blob_cur = con.cursor()
+    blob_cur.row_factory = None
+
     out: list[InkPage] = []
     for i, p in enumerate(pages):
         page_order = p["page_order"] if p["page_order"] is not None else i
         page_id = p["id"]
 
-        cur.execute(
+        blob_cur.execute(
             "SELECT bytes FROM blobs WHERE owner_id = ? AND ordinal = 0",
             (page_id,),
         )
-        row = cur.fetchone()
+        row = blob_cur.fetchone()
         if not row or row[0] is None:
             continue
 
@@ -61,8 +71,7 @@ def extract_single_page_png(db_path: Path, page_order: int) -> InkPage | None:
 
     Returns None if the requested page is not found.
     """
-    con = sqlite3.connect(str(db_path))
-    con.row_factory = sqlite3.Row
+    con = _connect_readonly(db_path)
     cur = con.cursor()
 
     # Find the page with the requested page_order
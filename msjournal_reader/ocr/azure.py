@@ -1,28 +1,70 @@
 from __future__ import annotations
 
+import io
 import os
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 from .base import OcrEngine
+from .ratelimit import TokenBucket
+
+# Throttled / temporarily unavailable: wait and send the same request again.
+RETRY_STATUS = {429, 503}
+RETRY_MIN_S = 1.0
+RETRY_MAX_S = 60.0
+
+
+def _retry_delay(r: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retry *attempt* (0-based): Retry-After if the
+    service sent one, else exponential backoff."""
+    try:
+        delay = float(r.headers.get("Retry-After", ""))
+    except ValueError:
+        delay = RETRY_MIN_S * (2**attempt)
+    return min(RETRY_MAX_S, max(RETRY_MIN_S, delay))
 
 
 @dataclass
 class AzureVisionReadEngine(OcrEngine):
-    """Azure AI Vision Read (v3.2) engine."""
+    """Azure AI Vision Read (v3.2) engine.
+
+    Holds one HTTP session for its lifetime, so the TCP/TLS connections to the
+    endpoint are kept alive and reused across pages (and across the threads
+    of a concurrent OCR run). Build one engine per run and share it.
+
+    Every call to the service (submit and poll) goes through one token bucket
+    of *rps* requests per second (0 disables it), and 429/503 responses are
+    retried with backoff up to *max_retries* times.
+    """
 
     endpoint: str
     key: str
     language: str = "en"
     timeout_s: int = 180
+    rps: float = 10.0
+    max_retries: int = 5
 
     name: str = "azure"
 
+    session: requests.Session = field(init=False, repr=False, compare=False)
+    limiter: TokenBucket | None = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.session = requests.Session()
+        self.session.headers["Ocp-Apim-Subscription-Key"] = self.key
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.limiter = TokenBucket(self.rps, burst=max(1, int(self.rps))) if self.rps > 0 else None
+
     @classmethod
-    def from_env(cls, *, language: str = "en", timeout_s: int = 180) -> "AzureVisionReadEngine":
+    def from_env(
+        cls, *, language: str = "en", timeout_s: int = 180, rps: float = 10.0
+    ) -> "AzureVisionReadEngine":
         load_dotenv()
         endpoint = os.environ.get("AZURE_VISION_ENDPOINT", "").strip()
         key = os.environ.get("AZURE_VISION_KEY", "").strip()
@@ -30,17 +72,29 @@ class AzureVisionReadEngine(OcrEngine):
             raise RuntimeError(
                 "Missing AZURE_VISION_ENDPOINT/AZURE_VISION_KEY (set env vars or create .env; see .env.example)"
             )
-        return cls(endpoint=endpoint, key=key, language=language, timeout_s=int(timeout_s))
+        return cls(
+            endpoint=endpoint, key=key, language=language, timeout_s=int(timeout_s), rps=float(rps)
+        )
 
-    def ocr_png_bytes(self, png_bytes: bytes) -> str:
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send one request within the rate limit, retrying throttled responses."""
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire()
+            r = self.session.request(method, url, timeout=30, **kwargs)
+            if r.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                return r
+            time.sleep(_retry_delay(r, attempt))
+            attempt += 1
+
+    def _read(self, data: bytes) -> list[dict]:
+        """Submit an image/document to Read and return its readResults (one per page)."""
         analyze_url = self.endpoint.rstrip("/") + "/vision/v3.2/read/analyze"
-        headers = {
-            "Ocp-Apim-Subscription-Key": self.key,
-            "Content-Type": "application/octet-stream",
-        }
+        headers = {"Content-Type": "application/octet-stream"}
         params = {"language": self.language}
 
-        r = requests.post(analyze_url, headers=headers, params=params, data=png_bytes, timeout=30)
+        r = self._request("POST", analyze_url, headers=headers, params=params, data=data)
         if r.status_code != 202:
             raise RuntimeError(f"Azure analyze failed ({r.status_code}): {r.text}")
 
@@ -50,24 +104,56 @@ class AzureVisionReadEngine(OcrEngine):
 
         deadline = time.time() + int(self.timeout_s)
         while time.time() < deadline:
-            pr = requests.get(op_loc, headers={"Ocp-Apim-Subscription-Key": self.key}, timeout=30)
+            pr = self._request("GET", op_loc)
             if pr.status_code != 200:
                 raise RuntimeError(f"Azure poll failed ({pr.status_code}): {pr.text}")
             j = pr.json()
             status = str(j.get("status", ""))
             if status.lower() == "succeeded":
                 analyze = j.get("analyzeResult") or {}
-                read_results = analyze.get("readResults") or []
-                lines_out: list[str] = []
-                for page in read_results:
-                    for line in page.get("lines") or []:
-                        t = str(line.get("text") or "").strip()
-                        if t:
-                            lines_out.append(t)
-                out = "\n".join(lines_out).strip()
-                return out + ("\n" if out and not out.endswith("\n") else "")
+                return analyze.get("readResults") or []
             if status.lower() == "failed":
                 raise RuntimeError(f"Azure Read failed: {j}")
             time.sleep(0.7)
 
         raise RuntimeError("Azure Read timed out polling")
+
+    @staticmethod
+    def _text(read_results: list[dict]) -> str:
+        lines_out: list[str] = []
+        for page in read_results:
+            for line in page.get("lines") or []:
+                t = str(line.get("text") or "").strip()
+                if t:
+                    lines_out.append(t)
+        out = "\n".join(lines_out).strip()
+        return out + ("\n" if out and not out.endswith("\n") else "")
+
+    def ocr_png_bytes(self, png_bytes: bytes) -> str:
+        return self._text(self._read(png_bytes))
+
+    def ocr_png_bytes_batch(self, pngs: list[bytes]) -> list[str]:
+        """OCR several pages with one Read request (as a multi-page TIFF).
+
+        Read's free (F0) tier only processes the first 2 pages of a document,
+        so only batch on a paid tier.
+        """
+        if len(pngs) <= 1:
+            return [self.ocr_png_bytes(p) for p in pngs]
+
+        from PIL import Image  # type: ignore
+
+        images = [Image.open(io.BytesIO(p)) for p in pngs]
+        buf = io.BytesIO()
+        images[0].save(
+            buf, format="TIFF", save_all=True, append_images=images[1:], compression="tiff_deflate"
+        )
+
+        by_page: dict[int, list[dict]] = {}
+        for res in self._read(buf.getvalue()):
+            by_page.setdefault(int(res.get("page") or 0), []).append(res)
+        if set(by_page) != set(range(1, len(pngs) + 1)):
+            raise RuntimeError(
+                f"Azure Read returned pages {sorted(by_page)} for a {len(pngs)}-page batch"
+            )
+        return [self._text(by_page[n]) for n in range(1, len(pngs) + 1)]
@@ -10,3 +10,10 @@ class OcrEngine(ABC):
     def ocr_png_bytes(self, png_bytes: bytes) -> str:
         """Return OCR text for a PNG (as bytes). Should return a trailing newline when non-empty."""
         raise NotImplementedError
+
+    def ocr_png_bytes_batch(self, pngs: list[bytes]) -> list[str]:
+        """OCR several PNGs, returning texts in input order.
+
+        Engines that can send many pages in one request override this.
+        """
+        return [self.ocr_png_bytes(p) for p in pngs]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: up to *burst* calls back to back, then
+    *rate_per_sec* calls per second on average.
+
+    acquire() reserves a token under the lock and sleeps outside it, so
+    waiting threads are released in the order they asked, one every
+    1/rate_per_sec seconds.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1) -> None:
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be > 0")
+        self.rate = float(rate_per_sec)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # May go negative: the deficit is how long this caller waits.
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
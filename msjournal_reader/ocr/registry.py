@@ -14,6 +14,7 @@ def build_engine(name: str, **kwargs) -> OcrEngine:
         return AzureVisionReadEngine.from_env(
             language=str(kwargs.get("azure_language", "en")),
             timeout_s=int(kwargs.get("azure_timeout_s", 180)),
+            rps=float(kwargs.get("azure_rps", 10)),
         )
 
     raise ValueError(f"Unsupported OCR engine: {name} (only 'azure' is implemented in this repo for now)")
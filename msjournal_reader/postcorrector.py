@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from pathlib import Path
 
+# Subword (SentencePiece) T5 models normalize line breaks away, so they are
+# trained with this token standing in for "\n" (see train_postcorrector_byt5.py).
+NEWLINE_TOKEN = "<nl>"
+_NEWLINE_TOKEN_RE = re.compile(r" ?" + re.escape(NEWLINE_TOKEN) + r" ?")
+
+
+def decode_lines(text: str) -> str:
+    """Turn NEWLINE_TOKEN in decoded model output back into line breaks."""
+    return _NEWLINE_TOKEN_RE.sub("\n", text)
+
 
 @dataclass
 class PostCorrector:
@@ -26,6 +37,10 @@ class PostCorrector:
         model.to(self.device)
         model.eval()
 
+        newline_token = NEWLINE_TOKEN in tok.get_added_vocab()
+        if newline_token:
+            text = text.replace("\n", NEWLINE_TOKEN)
+
         inp = tok(text, return_tensors="pt", truncation=True)
         inp = {k: v.to(self.device) for k, v in inp.items()}
 
@@ -35,6 +50,8 @@ class PostCorrector:
             do_sample=False,
         )
         out = tok.decode(out_ids[0], skip_special_tokens=True)
+        if newline_token:
+            out = decode_lines(out)
         out = out.strip()
         return out + ("\n" if out and not out.endswith("\n") else "")
 
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """Build (or incrementally update) a lightweight search index over exported journal pages.
 
+index_update_paths() re-indexes just a known set of pages (used after
+rewrite_exports_for_token), without walking the exports tree.
+
 Philosophy:
 - Canonical identity is (doc, page). This always exists.
 - Dates are optional metadata (nullable) because some journals have no dates or different formats.
@@ -36,6 +39,11 @@ from msjournal_reader.date.repair import candidate_to_date
 
 PAGE_RE = re.compile(r"(?:page|pdfpage)_(\d{4})")
 
+# Bumped when the on-disk layout changes; older DBs are reset and rebuilt.
+# v2: pages has an explicit integer id (VACUUM can't renumber it) and
+# pages_fts.rowid == pages.id, so queries join on that integer key.
+SCHEMA_VERSION = 2
+
 
 @dataclass(frozen=True)
 class Parsed:
@@ -74,7 +82,8 @@ def init_db(con: sqlite3.Connection) -> None:
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS pages (
-          path TEXT PRIMARY KEY,
+          id INTEGER PRIMARY KEY,
+          path TEXT NOT NULL UNIQUE,
           mtime_ns INTEGER NOT NULL,
           doc TEXT NOT NULL,
           page INTEGER NOT NULL,
@@ -93,7 +102,8 @@ def init_db(con: sqlite3.Connection) -> None:
     )
 
     con.execute("CREATE INDEX IF NOT EXISTS idx_pages_doc_page ON pages(doc, page);")
-    con.execute("CREATE INDEX IF NOT EXISTS idx_pages_date ON pages(date);")
+    # Matches query_index's ORDER BY date, doc, page (and serves date lookups).
+    con.execute("CREATE INDEX IF NOT EXISTS idx_pages_date_doc_page ON pages(date, doc, page);")
     con.execute("CREATE INDEX IF NOT EXISTS idx_pages_year ON pages(year);")
 
 
@@ -101,14 +111,16 @@ def _schema_version_ok(con: sqlite3.Connection) -> bool:
     """Return True if the existing schema is compatible.
 
     We intentionally keep this simple: if the required columns aren't present,
-    we trigger a reset.
+    or the DB predates SCHEMA_VERSION, we trigger a reset.
     """
     try:
         cols = [r[1] for r in con.execute("PRAGMA table_info(pages);").fetchall()]
     except sqlite3.OperationalError:
         return True
-    want = {"path", "mtime_ns", "doc", "page", "date", "year", "snippet"}
-    return set(cols) >= want
+    want = {"id", "path", "mtime_ns", "doc", "page", "date", "year", "snippet"}
+    if not set(cols) >= want:
+        return False
+    return int(con.execute("PRAGMA user_version;").fetchone()[0]) >= SCHEMA_VERSION
 
 
 def reset_db(con: sqlite3.Connection) -> None:
@@ -149,46 +161,121 @@ def upsert(
         ),
     )
 
-    con.execute("DELETE FROM pages_fts WHERE path = ?", (path,))
-    con.execute("INSERT INTO pages_fts(path, content) VALUES (?, ?)", (path, content))
+    # Keep pages_fts.rowid aligned with pages.id (see SCHEMA_VERSION).
+    page_id = con.execute("SELECT id FROM pages WHERE path = ?", (path,)).fetchone()[0]
+    con.execute("DELETE FROM pages_fts WHERE rowid = ?", (page_id,))
+    con.execute("INSERT INTO pages_fts(rowid, path, content) VALUES (?, ?, ?)", (page_id, path, content))
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--exports-base", required=True)
-    ap.add_argument("--db", required=True)
-    ap.add_argument("--max-snippet-chars", type=int, default=400)
-    ap.add_argument(
-        "--force",
-        action="store_true",
-        help="Re-parse and upsert all non-empty pages even if mtime_ns is unchanged.",
-    )
-    ap.add_argument(
-        "--reset",
-        action="store_true",
-        help="Drop and recreate tables before indexing.",
-    )
-    args = ap.parse_args()
+def delete_page(con: sqlite3.Connection, path: str) -> None:
+    row = con.execute("SELECT id FROM pages WHERE path = ?", (path,)).fetchone()
+    if row is None:
+        return
+    con.execute("DELETE FROM pages_fts WHERE rowid = ?", (row[0],))
+    con.execute("DELETE FROM pages WHERE id = ?", (row[0],))
 
-    exports_base = Path(args.exports_base)
-    db_path = Path(args.db)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    updated = 0
-    seen = 0
+def _open_db(db_path: Path, *, reset: bool = False) -> sqlite3.Connection:
+    con = sqlite3.connect(str(db_path))
+    con.row_factory = sqlite3.Row
 
-    with sqlite3.connect(str(db_path)) as con:
-        con.row_factory = sqlite3.Row
+    if reset:
+        reset_db(con)
 
-        if args.reset:
-            reset_db(con)
+    init_db(con)
 
+    if not _schema_version_ok(con):
+        reset_db(con)
         init_db(con)
+    con.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+    return con
+
+
+def index_page(
+    con: sqlite3.Connection,
+    page_path: Path,
+    *,
+    doc: str,
+    mtime_ns: int,
+    content: str,
+    max_snippet_chars: int,
+) -> None:
+    m = PAGE_RE.search(page_path.stem)
+    page_num = int(m.group(1)) if m else 0
+    parsed = parse(content, max_snippet_chars=max_snippet_chars)
+    upsert(
+        con,
+        path=str(page_path.resolve()),
+        mtime_ns=int(mtime_ns),
+        parsed=parsed,
+        doc=doc,
+        page=page_num,
+        content=content,
+    )
 
-        if not _schema_version_ok(con):
-            reset_db(con)
-            init_db(con)
 
+def index_update_paths(
+    db_path: Path, paths: list[Path], *, max_snippet_chars: int = 400
+) -> int | None:
+    """Re-index only *paths* (e.g. pages a rewrite just touched).
+
+    Each page is upserted under its parent dir as doc, exactly as a full walk
+    would index it (missing pages are dropped, empty ones skipped). Returns
+    the number of pages updated, or None if the index doesn't exist yet or
+    has an old schema, in which case the caller should run a full build.
+    """
+    if not db_path.exists():
+        return None
+    con = sqlite3.connect(str(db_path))
+    try:
+        if not _schema_version_ok(con) or not con.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'pages'"
+        ).fetchone():
+            return None
+        updated = 0
+        for page_path in paths:
+            key = str(page_path.resolve())
+            try:
+                st = page_path.stat()
+            except FileNotFoundError:
+                delete_page(con, key)
+                continue
+            content = _read_page_markdown(page_path) if st.st_size else ""
+            if not content:
+                continue
+            index_page(
+                con,
+                page_path,
+                doc=page_path.parent.name,
+                mtime_ns=st.st_mtime_ns,
+                content=content,
+                max_snippet_chars=max_snippet_chars,
+            )
+            updated += 1
+        con.commit()
+        return updated
+    finally:
+        con.close()
+
+
+def run(
+    exports_base: Path,
+    db_path: Path,
+    *,
+    max_snippet_chars: int = 400,
+    force: bool = False,
+    reset: bool = False,
+) -> None:
+    """Index every page under *exports_base* into *db_path* (incremental by mtime).
+
+    Callable directly from other scripts; main() is the CLI wrapper.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    updated = 0
+    seen = 0
+
+    with _open_db(db_path, reset=reset) as con:
         # Existing mtimes for incremental update
         existing: dict[str, int] = {}
         for r in con.execute("SELECT path, mtime_ns FROM pages;").fetchall():
@@ -211,32 +298,26 @@ def main() -> None:
                 if not content:
                     continue
 
-                m = PAGE_RE.search(page_path.stem)
-                page_num = int(m.group(1)) if m else 0
-
                 key = str(page_path.resolve())
                 seen += 1
 
-                if not args.force and key in existing and existing[key] == int(st.st_mtime_ns):
+                if not force and key in existing and existing[key] == int(st.st_mtime_ns):
                     continue
 
-                parsed = parse(content, max_snippet_chars=int(args.max_snippet_chars))
-                upsert(
+                index_page(
                     con,
-                    path=key,
-                    mtime_ns=int(st.st_mtime_ns),
-                    parsed=parsed,
+                    page_path,
                     doc=doc_dir.name,
-                    page=page_num,
+                    mtime_ns=st.st_mtime_ns,
                     content=content,
+                    max_snippet_chars=int(max_snippet_chars),
                 )
                 updated += 1
 
         # Delete records for files that no longer exist
         for path in list(existing.keys()):
             if not os.path.exists(path):
-                con.execute("DELETE FROM pages WHERE path = ?", (path,))
-                con.execute("DELETE FROM pages_fts WHERE path = ?", (path,))
+                delete_page(con, path)
 
         con.commit()
 
@@ -244,5 +325,31 @@ def main() -> None:
     print(f"pages_total_seen={seen} updated={updated}")
 
 
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--exports-base", required=True)
+    ap.add_argument("--db", required=True)
+    ap.add_argument("--max-snippet-chars", type=int, default=400)
+    ap.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse and upsert all non-empty pages even if mtime_ns is unchanged.",
+    )
+    ap.add_argument(
+        "--reset",
+        action="store_true",
+        help="Drop and recreate tables before indexing.",
+    )
+    args = ap.parse_args(argv)
+
+    run(
+        Path(args.exports_base),
+        Path(args.db),
+        max_snippet_chars=int(args.max_snippet_chars),
+        force=args.force,
+        reset=args.reset,
+    )
+
+
 if __name__ == "__main__":
     main()
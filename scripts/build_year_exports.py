@@ -76,38 +76,24 @@ def iter_doc_pages(doc_dir: Path) -> list[Page]:
     return pages
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--exports-base", required=True)
-    ap.add_argument("--out-dir", required=True)
-    ap.add_argument("--group-by", choices=["auto", "date", "page"], default="auto")
-    ap.add_argument("--include-source", action="store_true")
-    ap.add_argument(
-        "--fill-missing-days",
-        action="store_true",
-        help="In date-grouped mode, insert placeholder headings for missing days within each year.",
-    )
-    ap.add_argument("--min-year", type=int, default=None, help="Ignore assigned dates earlier than this year")
-    ap.add_argument("--max-year", type=int, default=None, help="Ignore assigned dates later than this year")
-
-    # Date-policy knobs (optional)
-    ap.add_argument("--no-date-repair", action="store_true")
-    ap.add_argument("--no-infer-continuations", action="store_true")
-    ap.add_argument("--auto-min-hits", type=int, default=3)
-    ap.add_argument("--auto-scan-pages", type=int, default=20)
-
-    args = ap.parse_args()
-
-    exports_base = Path(args.exports_base)
-    out_dir = Path(args.out_dir)
+def run(
+    exports_base: Path,
+    out_dir: Path,
+    *,
+    group_by: str = "auto",
+    include_source: bool = False,
+    fill_missing_days: bool = False,
+    min_year: int | None = None,
+    max_year: int | None = None,
+    policy: DatePolicy | None = None,
+) -> None:
+    """Write grouped exports for every doc under *exports_base* into *out_dir*.
+
+    Callable directly from other scripts; main() is the CLI wrapper.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
-
-    policy = DatePolicy(
-        allow_repair=not args.no_date_repair,
-        allow_infer_continuations=not args.no_infer_continuations,
-        auto_min_hits=int(args.auto_min_hits),
-        auto_scan_pages=int(args.auto_scan_pages),
-    )
+    if policy is None:
+        policy = DatePolicy()
 
     entries_by_year: dict[int, list[Entry]] = {}
 
@@ -130,7 +116,7 @@ def main() -> None:
                 auto_scan_pages=policy.auto_scan_pages,
             )
 
-        mode = args.group_by
+        mode = group_by
         if mode == "auto":
             mode = "date" if auto_detect_date_mode(pages, doc_policy) else "page"
 
@@ -140,7 +126,7 @@ def main() -> None:
             parts: list[str] = [f"# Journal Pages — {doc_dir.name}\n"]
             for p in pages:
                 parts.append(f"\n## Page {p.page:04d}\n")
-                if args.include_source:
+                if include_source:
                     parts.append(f"\n### ({doc_dir.name}/{p.path.name})\n")
                 parts.append(p.text.rstrip() + "\n")
             out_path.write_text("\n".join(parts).strip() + "\n", encoding="utf-8")
@@ -156,7 +142,7 @@ def main() -> None:
             parts = [f"# Journal Pages — {doc_dir.name}\n", "\n*(date grouping requested but no dates were parseable; falling back to pages)*\n"]
             for p in pages:
                 parts.append(f"\n## Page {p.page:04d}\n")
-                if args.include_source:
+                if include_source:
                     parts.append(f"\n### ({doc_dir.name}/{p.path.name})\n")
                 parts.append(p.text.rstrip() + "\n")
             out_path.write_text("\n".join(parts).strip() + "\n", encoding="utf-8")
@@ -169,9 +155,9 @@ def main() -> None:
                 # it will still be searchable via the index.
                 continue
 
-            if args.min_year is not None and a.d.year < int(args.min_year):
+            if min_year is not None and a.d.year < int(min_year):
                 continue
-            if args.max_year is not None and a.d.year > int(args.max_year):
+            if max_year is not None and a.d.year > int(max_year):
                 continue
 
             y = a.d.year
@@ -197,7 +183,7 @@ def main() -> None:
         for e in items:
             d = date.fromisoformat(e.key)
 
-            if args.fill_missing_days and cur_date is not None:
+            if fill_missing_days and cur_date is not None:
                 dd = cur_date.fromordinal(cur_date.toordinal() + 1)
                 while dd < d and dd.year == year:
                     parts.append(f"\n## {dd.isoformat()}\n")
@@ -209,11 +195,11 @@ def main() -> None:
                 cur_day = e.key
                 cur_date = d
 
-            if args.include_source:
+            if include_source:
                 parts.append(f"\n### ({e.doc}/page_{e.page:04d}.md)\n")
             parts.append(e.text.rstrip() + "\n")
 
-        if args.fill_missing_days and cur_date is not None and cur_date.year == year:
+        if fill_missing_days and cur_date is not None and cur_date.year == year:
             dd = cur_date.fromordinal(cur_date.toordinal() + 1)
             end = date(year, 12, 31)
             while dd <= end:
@@ -225,5 +211,44 @@ def main() -> None:
         print(f"OK: wrote {out_path} ({len(items)} entries)")
 
 
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--exports-base", required=True)
+    ap.add_argument("--out-dir", required=True)
+    ap.add_argument("--group-by", choices=["auto", "date", "page"], default="auto")
+    ap.add_argument("--include-source", action="store_true")
+    ap.add_argument(
+        "--fill-missing-days",
+        action="store_true",
+        help="In date-grouped mode, insert placeholder headings for missing days within each year.",
+    )
+    ap.add_argument("--min-year", type=int, default=None, help="Ignore assigned dates earlier than this year")
+    ap.add_argument("--max-year", type=int, default=None, help="Ignore assigned dates later than this year")
+
+    # Date-policy knobs (optional)
+    ap.add_argument("--no-date-repair", action="store_true")
+    ap.add_argument("--no-infer-continuations", action="store_true")
+    ap.add_argument("--auto-min-hits", type=int, default=3)
+    ap.add_argument("--auto-scan-pages", type=int, default=20)
+
+    args = ap.parse_args(argv)
+
+    run(
+        Path(args.exports_base),
+        Path(args.out_dir),
+        group_by=args.group_by,
+        include_source=args.include_source,
+        fill_missing_days=args.fill_missing_days,
+        min_year=args.min_year,
+        max_year=args.max_year,
+        policy=DatePolicy(
+            allow_repair=not args.no_date_repair,
+            allow_infer_continuations=not args.no_infer_continuations,
+            auto_min_hits=int(args.auto_min_hits),
+            auto_scan_pages=int(args.auto_scan_pages),
+        ),
+    )
+
+
 if __name__ == "__main__":
     main()
@@ -232,10 +232,12 @@ def cmd_answer(
     return f"Added correction: *{tok}* → *{repl}*. Saved; will be integrated into exports/index later."
 
 
+_SLUG_SEP_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _slug(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
+    # Runs of separators (dashes included) collapse to one "-" in this one sub.
+    s = _SLUG_SEP_RE.sub("-", s.strip().lower()).strip("-")
     return s or "journal"
 
 
@@ -24,10 +24,12 @@ from pathlib import Path
 from msjournal_reader.ink import extract_single_page_png
 
 
+_SLUG_SEP_RE = re.compile(r"[^a-z0-9]+")
+
+
 def slug(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
+    # Runs of separators (dashes included) collapse to one "-" in this one sub.
+    s = _SLUG_SEP_RE.sub("-", s.strip().lower()).strip("-")
     return s or "journal"
 
 
@@ -38,7 +38,7 @@ from pathlib import Path
 
 import fitz  # PyMuPDF
 
-from msjournal_reader.corrections import apply_corrections
+from msjournal_reader.corrections import apply_corrections_compiled, load_corrections
 from msjournal_reader.ocr.registry import build_engine
 
 
@@ -178,6 +178,8 @@ def main() -> None:
         raise SystemExit(f"Missing PDF: {pdf_path}")
 
     corr_path = Path(args.corrections_map).expanduser().resolve() if args.corrections_map else None
+    # Parse + compile the map once, not once per rendered page.
+    corrections = load_corrections(corr_path)
 
     engine = build_engine("azure")
 
@@ -208,7 +210,7 @@ def main() -> None:
         sha = hashlib.sha256(png).hexdigest()
 
         text = engine.ocr_png_bytes(png)
-        text = apply_corrections(text, corr_path)
+        text = apply_corrections_compiled(text, corrections)
         d = parse_date(text)
         if not d:
             continue
@@ -19,15 +19,17 @@ import re
 import sys
 from pathlib import Path
 
-from msjournal_reader.corrections import apply_corrections
+from msjournal_reader.corrections import apply_corrections_compiled, load_corrections
 from msjournal_reader.ink import extract_pages_png
 from msjournal_reader.ocr.registry import build_engine
 
 
+_SLUG_SEP_RE = re.compile(r"[^a-z0-9]+")
+
+
 def slug(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
+    # Runs of separators (dashes included) collapse to one "-" in this one sub.
+    s = _SLUG_SEP_RE.sub("-", s.strip().lower()).strip("-")
     return s or "journal"
 
 
@@ -61,25 +63,36 @@ def process_ink(
                 f"Original error: {e}"
             )
 
-    pages = extract_pages_png(ink_path)
-
-    combined_md_parts: list[str] = []
+    # Parse + compile the map once, not once per page.
+    corrections = load_corrections(corrections_map)
 
-    for page in pages:
-        text = engine.ocr_png_bytes(page.png_bytes)
-        text = apply_corrections(text, corrections_map)
-        if postcorrector:
-            text = postcorrector.apply(text)
-
-        page_md = doc_out / f"page_{page.order:04d}.md"
-
-        page_md.write_text(f"# Page {page.order}\n\n{text}\n", encoding="utf-8")
-
-        combined_md_parts.append(f"# Page {page.order}\n\n{text}\n")
+    pages = extract_pages_png(ink_path)
 
     combined_md_path = doc_out / "combined.md"
 
-    combined_md_path.write_text("\n".join(combined_md_parts).strip() + "\n", encoding="utf-8")
+    # Stream combined.md page by page instead of holding every page twice.
+    # Trailing whitespace of the previous page is deferred so the final file
+    # ends with exactly one newline.
+    with combined_md_path.open("w", encoding="utf-8") as combined_md_f:
+        pending_tail: str | None = None
+        for page in pages:
+            text = engine.ocr_png_bytes(page.png_bytes)
+            text = apply_corrections_compiled(text, corrections)
+            if postcorrector:
+                text = postcorrector.apply(text)
+
+            page_text = f"# Page {page.order}\n\n{text}\n"
+
+            page_md = doc_out / f"page_{page.order:04d}.md"
+            page_md.write_text(page_text, encoding="utf-8")
+
+            if pending_tail is not None:
+                combined_md_f.write(pending_tail + "\n")
+            body = page_text.rstrip()
+            pending_tail = page_text[len(body) :]
+            combined_md_f.write(body)
+
+        combined_md_f.write("\n")
 
     return combined_md_path
 
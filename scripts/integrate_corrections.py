@@ -25,6 +25,7 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import mmap
 import time
 from pathlib import Path
 
@@ -41,9 +42,18 @@ def save_json(path: Path, obj) -> None:
     path.write_text(json.dumps(obj, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
 
 
+# Below this size mmap setup costs more than a plain read.
+MMAP_MIN_BYTES = 64 * 1024
+
+
 def sha1_file(path: Path) -> str:
     h = hashlib.sha1()
-    h.update(path.read_bytes())
+    with path.open("rb") as f:
+        if path.stat().st_size < MMAP_MIN_BYTES:
+            h.update(f.read())
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
     return h.hexdigest()
 
 
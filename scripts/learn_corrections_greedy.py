@@ -14,6 +14,8 @@ from pathlib import Path
 
 from jiwer import process_words, wer
 
+_PAGE_ID_RE = re.compile(r"page[-_](\d{4})")
+
 
 def normalize_for_wer(s: str) -> str:
     s = s.lower()
@@ -37,8 +39,8 @@ def normalize_for_wer(s: str) -> str:
     return s
 
 
-def apply_corr(text: str, patt: str, repl: str) -> str:
-    return re.sub(patt, repl, text, flags=re.IGNORECASE)
+def apply_corr(text: str, patt: re.Pattern[str], repl: str) -> str:
+    return patt.sub(repl, text)
 
 
 @dataclass(frozen=True)
@@ -48,14 +50,8 @@ class Pair:
     hyp_norm: str
 
 
-def score(pairs: list[Pair], corrs: list[tuple[str, str]]) -> float:
-    total = 0.0
-    for p in pairs:
-        hyp = p.hyp_norm
-        for patt, repl in corrs:
-            hyp = apply_corr(hyp, patt, repl)
-        total += wer(p.gold_norm, hyp)
-    return total / max(1, len(pairs))
+def page_wers(pairs: list[Pair], hyps: list[str]) -> list[float]:
+    return [wer(p.gold_norm, h) for p, h in zip(pairs, hyps)]
 
 
 def extract_candidates(pairs: list[Pair]) -> dict[tuple[str, str], int]:
@@ -91,6 +87,12 @@ def main() -> None:
     ap.add_argument("--out", required=True)
     ap.add_argument("--max-corrections", type=int, default=30)
     ap.add_argument("--min-count", type=int, default=1)
+    ap.add_argument(
+        "--patience",
+        type=int,
+        default=None,
+        help="Stop after this many consecutive rejected candidates; 0 disables (default: max(50, candidates/10))",
+    )
     args = ap.parse_args()
 
     gold_dir = Path(args.gold_dir)
@@ -98,7 +100,7 @@ def main() -> None:
 
     pairs: list[Pair] = []
     for gp in sorted(gold_dir.glob("*.txt")):
-        m = re.search(r"page[-_](\d{4})", gp.name)
+        m = _PAGE_ID_RE.search(gp.name)
         if not m:
             continue
         page = m.group(1)
@@ -118,29 +120,62 @@ def main() -> None:
     if not pairs:
         raise SystemExit("No (gold,hyp) pairs found")
 
-    base = score(pairs, [])
+    # Per-page hypotheses/WERs with all chosen corrections applied so far.
+    hyps = [p.hyp_norm for p in pairs]
+    wers = page_wers(pairs, hyps)
+    total = sum(wers)
+    n_pairs = len(pairs)
+
+    base = total / n_pairs
     print(f"Base avg WER: {base:.4f} across {len(pairs)} pages")
 
     cand_counts = extract_candidates(pairs)
-    candidates = [(patt, repl, c) for (patt, repl), c in cand_counts.items() if c >= args.min_count]
-    candidates.sort(key=lambda x: (-x[2], len(x[0])))
-
-    chosen: list[tuple[str, str]] = []
+    # Compile each candidate once; the greedy loop applies them many times.
+    candidates = [
+        (re.compile(patt, re.IGNORECASE), repl, c)
+        for (patt, repl), c in cand_counts.items()
+        if c >= args.min_count
+    ]
+    candidates.sort(key=lambda x: (-x[2], len(x[0].pattern)))
+
+    chosen: list[tuple[re.Pattern[str], str]] = []
     best = base
 
+    patience = args.patience if args.patience is not None else max(50, len(candidates) // 10)
+    rejected_streak = 0
+
     for patt, repl, c in candidates:
         if len(chosen) >= args.max_corrections:
             break
-        trial = chosen + [(patt, repl)]
-        s = score(pairs, trial)
+        if patience > 0 and rejected_streak >= patience:
+            print(f"Stopping: {rejected_streak} consecutive candidates rejected")
+            break
+        # Only pages the rule matches can change; skip no-op candidates
+        # and re-score just the touched pages.
+        touched = [i for i, h in enumerate(hyps) if patt.search(h)]
+        if not touched:
+            rejected_streak += 1
+            continue
+        trial_hyps = [apply_corr(hyps[i], patt, repl) for i in touched]
+        trial_wers = page_wers([pairs[i] for i in touched], trial_hyps)
+        trial_total = total + sum(trial_wers) - sum(wers[i] for i in touched)
+        s = trial_total / n_pairs
         if s < best - 1e-6:
             chosen.append((patt, repl))
+            for i, h, w in zip(touched, trial_hyps, trial_wers):
+                hyps[i] = h
+                wers[i] = w
+            total = trial_total
             best = s
-            print(f"+ keep (count={c}) {patt} -> {repl}  avgWER={best:.4f}")
+            rejected_streak = 0
+            print(f"+ keep (count={c}) {patt.pattern} -> {repl}  avgWER={best:.4f}")
+        else:
+            rejected_streak += 1
 
     outp = Path(args.out)
     outp.parent.mkdir(parents=True, exist_ok=True)
-    outp.write_text(json.dumps(chosen, indent=2) + "\n", encoding="utf-8")
+    out_rules = [[patt.pattern, repl] for patt, repl in chosen]
+    outp.write_text(json.dumps(out_rules, indent=2) + "\n", encoding="utf-8")
     print(f"OK: wrote {len(chosen)} corrections -> {outp} (avgWER {best:.4f})")
 
 
@@ -30,19 +30,30 @@ import json
 import math
 import os
 import re
+import sys
 import time
+from bisect import bisect_right
 from collections import Counter, defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 
+# Make this script runnable without installing the package (no PYTHONPATH required)
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from msjournal_reader.fast import json_dumpb  # noqa: E402
+
 TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z']{1,}")
 PAGE_RE = re.compile(r"page_(\d{4})")
+_SLUG_SEP_RE = re.compile(r"[^a-z0-9]+")
+# Example lines are only taken from the top of each page.
+EXAMPLE_MAX_LINES = 120
 
 
 def slug(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
+    # Runs of separators (dashes included) collapse to one "-" in this one sub.
+    s = _SLUG_SEP_RE.sub("-", s.strip().lower()).strip("-")
     return s or "journal"
 
 
@@ -77,6 +88,19 @@ def tokenize(text: str) -> list[str]:
     return [m.group(0) for m in TOKEN_RE.finditer(text)]
 
 
+def _newline_positions(text: str) -> list[int]:
+    out: list[int] = []
+    i = text.find("\n")
+    while i >= 0:
+        out.append(i)
+        i = text.find("\n", i + 1)
+    return out
+
+
+def _jsonl_line(obj) -> bytes:
+    return json_dumpb(obj) + b"\n"
+
+
 def load_json(p: Path, default):
     try:
         return json.loads(p.read_text(encoding="utf-8"))
@@ -160,9 +184,7 @@ class Candidate:
 
 
 def _slug(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
+    s = _SLUG_SEP_RE.sub("-", s.strip().lower()).strip("-")
     return s or "journal"
 
 
@@ -221,36 +243,36 @@ def main() -> None:
 
     # 1) Corpus token counts + gather examples lines
     counts: Counter[str] = Counter()
-    examples: dict[str, list[dict]] = defaultdict(list)
+    # Compact (path, doc, page, line) tuples; dicts are only built for the
+    # handful of tokens that make it into the queue.
+    examples: dict[str, list[tuple[str, str, int, str]]] = defaultdict(list)
 
     for doc, page_path in iter_page_texts(exports_base, allow_docs=allow_docs):
         text = _read_page_markdown(page_path)
-        toks = tokenize(text)
-        if not toks:
-            continue
-        # Keep up to a few example lines per token
-        lines = text.splitlines()
-        for t in toks:
-            tl = t.lower()
+        # Single scan over the page: count every token, and keep up to a few
+        # example lines per token (from the first EXAMPLE_MAX_LINES lines).
+        # Line text is only sliced out when a token still needs an example.
+        newline_idx: list[int] | None = None
+        page_num: int | None = None
+        # Interned so repeated tokens/docs/paths share one string object.
+        doc = sys.intern(doc)
+        page_path_str = sys.intern(str(page_path))
+        for m in TOKEN_RE.finditer(text):
+            tl = sys.intern(m.group(0).lower())
             counts[tl] += 1
-        # For examples, scan lines once
-        for line in lines[:120]:
-            if not line.strip():
+            if len(examples[tl]) >= 4:
+                continue
+            if newline_idx is None:
+                newline_idx = _newline_positions(text)
+            line_no = bisect_right(newline_idx, m.start())
+            if line_no >= EXAMPLE_MAX_LINES:
                 continue
-            for m in TOKEN_RE.finditer(line):
-                tl = m.group(0).lower()
-                if len(examples[tl]) >= 4:
-                    continue
+            if page_num is None:
                 pm = PAGE_RE.search(page_path.stem)
                 page_num = int(pm.group(1)) if pm else 0
-                examples[tl].append(
-                    {
-                        "path": str(page_path),
-                        "doc": doc,
-                        "page": page_num,
-                        "line": line.strip(),
-                    }
-                )
+            start = newline_idx[line_no - 1] + 1 if line_no else 0
+            end = newline_idx[line_no] if line_no < len(newline_idx) else len(text)
+            examples[tl].append((page_path_str, doc, page_num, text[start:end].strip()))
 
     if not counts:
         raise SystemExit("No tokens found; exports-base empty?")
@@ -330,13 +352,17 @@ def main() -> None:
             "token": c.token,
             "count": c.count,
             "suggestions": c.suggestions,
-            "examples": examples.get(c.token, [])[:4],
+            "examples": [
+                {"path": path, "doc": doc, "page": page, "line": line}
+                for path, doc, page, line in examples.get(c.token, [])[:4]
+            ],
             "created_at": now,
         }
         items.append(item)
 
     # Write as JSONL (one item per line)
-    out_queue.write_text("\n".join(json.dumps(x, ensure_ascii=False) for x in items) + ("\n" if items else ""), encoding="utf-8")
+    with out_queue.open("wb") as f:
+        f.writelines(_jsonl_line(x) for x in items)
 
     print(f"OK: wrote queue {out_queue} items={len(items)}")
 
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Incremental nightly journal sync with file-state tracking.
 
-Checks each .ink journal file's mtime + size + md5 (and the corrections map's
-hash) against a persisted state file.  Only re-imports journals whose source
-files have actually changed.  Always rebuilds yearly exports and the FTS index
-when at least one journal was re-imported.
+Checks each .ink journal file's mtime + size + content hash (and the
+corrections map's) against a persisted state file.  Only re-imports journals
+whose source files have actually changed.  The hash (BLAKE3 if installed,
+else md5) is only recomputed when size/mtime differ from the saved state (or
+with --force); otherwise the saved hash is carried over.
+
+Always rebuilds yearly exports and the FTS index when at least one journal
+was re-imported.
 
 State file location: user_corrections/local/file_state.json
 
@@ -23,48 +27,122 @@ Options:
 from __future__ import annotations
 
 import argparse
-import hashlib
+import importlib
 import json
 import os
-import runpy
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from msjournal_reader.fast import HASH_ALGO, json_dumps, json_loads, new_hasher
+from msjournal_reader.fileio import atomic_write_text
+
 # ---------------------------------------------------------------------------
 # State helpers
 # ---------------------------------------------------------------------------
 
 STATE_FILE = "user_corrections/local/file_state.json"
 
+# Content hashes for fingerprints come from msjournal_reader.fast (BLAKE3 when
+# installed, md5 otherwise). The state file is local (not adversarial); the
+# algorithm name is stored next to each hash so a switch never compares across
+# algorithms.
+
+
+HASH_CHUNK_SIZE = 4 << 20
+
+# One read buffer per thread, reused across files (fingerprinting is threaded).
+_hash_buffers = threading.local()
+
+
+def _hash_buffer() -> memoryview:
+    view = getattr(_hash_buffers, "view", None)
+    if view is None:
+        view = _hash_buffers.view = memoryview(bytearray(HASH_CHUNK_SIZE))
+    return view
 
-def _file_md5(p: Path, chunk_size: int = 1 << 20) -> str:
-    h = hashlib.md5()
+
+def _file_hash(p: Path) -> str:
+    h = new_hasher()
+    view = _hash_buffer()
     with open(p, "rb") as f:
         while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
+            n = f.readinto(view)
+            if not n:
                 break
-            h.update(chunk)
+            h.update(view[:n])
     return h.hexdigest()
 
 
-def _file_fingerprint(p: Path) -> dict:
-    """Return a dict describing the current on-disk state of *p*."""
-    st = p.stat()
+def _stat_fingerprint(p: Path, st: os.stat_result | None = None) -> dict:
+    """Return the cheap (stat-only) part of *p*'s fingerprint."""
+    if st is None:
+        st = p.stat()
     return {
         "path": str(p),
         "mtime": st.st_mtime,
         "size": st.st_size,
-        "md5": _file_md5(p),
     }
 
 
+def _hash_fingerprint(p: Path, st: os.stat_result | None = None) -> dict:
+    """Return a dict describing the current on-disk state of *p*, including its hash."""
+    fp = _stat_fingerprint(p, st)
+    fp["algo"] = HASH_ALGO
+    fp["hash"] = _file_hash(p)
+    return fp
+
+
+def _file_fingerprint(
+    p: Path, old: dict | None, *, force: bool = False, st: os.stat_result | None = None
+) -> dict:
+    """Fingerprint *p*, hashing only when size/mtime differ from *old*.
+
+    When size and mtime match the previous state (and it was hashed with the
+    same algorithm), the previous hash is reused without reading the file.
+    *st* is an already-taken stat of *p*, if the caller has one.
+    """
+    if st is None:
+        st = p.stat()
+    fp = _stat_fingerprint(p, st)
+    if (
+        not force
+        and old
+        and old.get("hash")
+        and old.get("algo") == HASH_ALGO
+        and fp["size"] == old.get("size")
+        and fp["mtime"] == old.get("mtime")
+    ):
+        fp["algo"] = HASH_ALGO
+        fp["hash"] = old["hash"]
+        return fp
+    return _hash_fingerprint(p, st)
+
+
+def _scan_parents(paths: list[Path]) -> dict[Path, os.DirEntry]:
+    """Map each existing path in *paths* to its DirEntry, scanning each parent dir once."""
+    wanted: dict[Path, set[str]] = {}
+    for p in paths:
+        wanted.setdefault(p.parent, set()).add(p.name)
+    out: dict[Path, os.DirEntry] = {}
+    for parent, names in wanted.items():
+        try:
+            with os.scandir(parent) as it:
+                for e in it:
+                    if e.name in names and not e.is_dir():
+                        out[parent / e.name] = e
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return out
+
+
 def load_state(repo_root: Path) -> dict:
     sp = repo_root / STATE_FILE
     if sp.exists():
         try:
-            return json.loads(sp.read_text(encoding="utf-8"))
+            return json_loads(sp.read_bytes())
         except (json.JSONDecodeError, OSError):
             return {}
     return {}
@@ -73,32 +151,37 @@ def load_state(repo_root: Path) -> dict:
 def save_state(repo_root: Path, state: dict) -> None:
     sp = repo_root / STATE_FILE
     sp.parent.mkdir(parents=True, exist_ok=True)
-    sp.write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    atomic_write_text(sp, json_dumps(state, indent=True) + "\n")
 
 
 def _has_changed(fp: dict, old: dict | None) -> bool:
     """Return True if a file fingerprint differs from old state."""
     if old is None:
         return True
-    # Compare size + mtime first (cheap), then md5
+    # Compare size + mtime first (cheap), then the content hash. Hashes from a
+    # different algorithm (e.g. an md5-era state file) can't be compared, so
+    # matching size + mtime is taken as unchanged in that case.
     if fp["size"] != old.get("size") or fp["mtime"] != old.get("mtime"):
         return True
-    if fp["md5"] != old.get("md5"):
+    if fp.get("algo") != old.get("algo"):
+        return False
+    if fp["hash"] != old.get("hash"):
         return True
     return False
 
 
 # ---------------------------------------------------------------------------
-# Pipeline helpers (invoke existing scripts via runpy)
+# Pipeline helpers (call sibling scripts' main(argv) in-process)
 # ---------------------------------------------------------------------------
 
-def _run_script(repo_root: Path, script_name: str, argv: list[str]) -> None:
-    original = list(sys.argv)
-    try:
-        sys.argv = [script_name] + argv
-        runpy.run_path(str(repo_root / "scripts" / script_name), run_name="__main__")
-    finally:
-        sys.argv = original
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def _run_script(script_name: str, argv: list[str]) -> None:
+    """Import scripts/<script_name> once and call its main(argv) directly."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    importlib.import_module(Path(script_name).stem).main(argv)
 
 
 # ---------------------------------------------------------------------------
@@ -136,25 +219,49 @@ def main() -> None:
     if not all([exports_base, yearly_out, index_db]):
         raise SystemExit("pipeline_paths.json must define exports_base, yearly_out, index_db")
 
-    # Corrections map fingerprint
-    corr_map_rel = cfg.get("corrections_map", "")
-    corr_map_path = (repo_root / corr_map_rel).resolve() if corr_map_rel else None
-    corr_fp = _file_fingerprint(corr_map_path) if corr_map_path and corr_map_path.exists() else None
-
     # Load previous state
     state = load_state(repo_root)
     prev_journals = state.get("journals", {})
     prev_corr = state.get("corrections_map")
 
+    # Corrections map fingerprint
+    corr_map_rel = cfg.get("corrections_map", "")
+    corr_map_path = (repo_root / corr_map_rel).resolve() if corr_map_rel else None
+    corr_fp = (
+        _file_fingerprint(corr_map_path, prev_corr, force=args.force)
+        if corr_map_path and corr_map_path.exists()
+        else None
+    )
+
     # Determine which journals changed
     changed_journals: list[Path] = []
     journal_fps: dict[str, dict] = {}
 
+    # Journals usually share a few parent dirs: list each dir once instead of
+    # probing every journal with exists(), then stat each present journal once.
+    entries = _scan_parents(journals)
+    present: list[Path] = []
     for ink in journals:
-        if not ink.exists():
+        # exists() fallback: names may differ in case on Windows mounts.
+        if ink not in entries and not ink.exists():
             print(f"SKIP missing: {ink}")
             continue
-        fp = _file_fingerprint(ink)
+        present.append(ink)
+
+    # Fingerprint in parallel: hashing is IO-bound and releases the GIL, and
+    # unchanged journals only cost a stat.
+    def _fingerprint_journal(ink: Path) -> dict:
+        return _file_fingerprint(
+            ink,
+            prev_journals.get(str(ink)),
+            force=args.force,
+            st=entries[ink].stat() if ink in entries else None,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(present)))) as ex:
+        fps = list(ex.map(_fingerprint_journal, present))
+
+    for ink, fp in zip(present, fps):
         journal_fps[str(ink)] = fp
 
         if args.force:
@@ -184,6 +291,7 @@ def main() -> None:
         return
 
     anything_done = False
+    rewrite_corr = bool(corr_map_path) and (corr_changed or args.rewrite_corr or args.force)
 
     # Phase 1: Re-import changed journals via update_exports.py
     if changed_journals:
@@ -195,11 +303,13 @@ def main() -> None:
 
         try:
             os.chdir(str(repo_root))
-            _run_script(repo_root, "update_exports.py", [
+            _run_script("update_exports.py", [
                 "--config", str(tmp_cfg_path),
                 "--exports-base", exports_base,
                 "--yearly-out", yearly_out,
                 "--index-db", index_db,
+                # Phase 2 rebuilds yearly + index anyway; don't do it twice.
+                *(["--skip-rebuild"] if rewrite_corr else []),
             ])
         finally:
             tmp_cfg_path.unlink(missing_ok=True)
@@ -207,20 +317,21 @@ def main() -> None:
         anything_done = True
 
     # Phase 2: Rewrite corrections if map changed (or --force / --rewrite-corr)
-    if corr_changed or args.rewrite_corr or args.force:
-        if corr_map_path:
-            print("Rewriting exports with current corrections map...")
-            os.chdir(str(repo_root))
-            _run_script(repo_root, "rewrite_exports_with_corrections.py", [
-                "--corrections-map", str(corr_map_path),
-                "--exports-base", exports_base,
-                "--rebuild-yearly",
-                "--rebuild-index",
-            ])
-            anything_done = True
+    if rewrite_corr:
+        print("Rewriting exports with current corrections map...")
+        os.chdir(str(repo_root))
+        _run_script("rewrite_exports_with_corrections.py", [
+            "--corrections-map", str(corr_map_path),
+            "--exports-base", exports_base,
+            "--yearly-out", yearly_out,
+            "--index-db", index_db,
+            "--rebuild-yearly",
+            "--rebuild-index",
+        ])
+        anything_done = True
 
-    # Phase 3: If only yearly/index rebuild is needed (e.g. changed journals
-    # but update_exports already handles rebuild), we're done.
+    # Phase 3: Nothing left to do: yearly + index were rebuilt exactly once,
+    # by Phase 2 if it ran, otherwise by update_exports in Phase 1.
 
     if not anything_done:
         print("NOOP: nothing changed since last sync")
@@ -4,13 +4,23 @@
 Usage:
   python3 scripts/query_index.py --db /path/to/journal_index.sqlite --q "october 7" --limit 10
   python3 scripts/query_index.py --db ... --q "taxes" --from 2025-12-01 --to 2025-12-31
+
+For repeated queries from a long-running process, use Searcher instead.
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
 import re
 import sqlite3
+import sys
+from pathlib import Path
+
+# build_index.py schema version from which pages_fts.rowid == pages.id.
+ROWID_JOIN_SCHEMA_VERSION = 2
+
+OUTPUT_FLUSH_ROWS = 256
 
 
 def _coerce_db_path(p: str) -> str:
@@ -36,33 +46,38 @@ def _coerce_fts_query(q: str) -> str:
     return q
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--db", required=True)
-    ap.add_argument("--q", required=True, help="FTS query")
-    ap.add_argument("--limit", type=int, default=10)
-    ap.add_argument("--from", dest="date_from", default=None)
-    ap.add_argument("--to", dest="date_to", default=None)
-    args = ap.parse_args()
+def _connect_readonly(db_path: str) -> sqlite3.Connection:
+    """Open the index read-only, with mmap'd reads and a larger page cache."""
+    uri = Path(db_path).expanduser().resolve().as_uri() + "?mode=ro"
+    con = sqlite3.connect(uri, uri=True)
+    con.execute("PRAGMA query_only=1")
+    con.execute("PRAGMA mmap_size=1073741824")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA temp_store=MEMORY")
+    return con
 
-    db_path = _coerce_db_path(args.db)
-    q = _coerce_fts_query(args.q)
-
-    con = sqlite3.connect(db_path)
 
+def _build_sql(rowid_join: bool, has_from: bool, has_to: bool) -> str:
     where = []
-    params: list[object] = []
-
-    if args.date_from:
+    if has_from:
         where.append("p.date >= ?")
-        params.append(args.date_from)
-    if args.date_to:
+    if has_to:
         where.append("p.date <= ?")
-        params.append(args.date_to)
 
+    if rowid_join:
+        # Materialize FTS hits by rowid, then join pages on its integer id.
+        where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+        return (
+            "WITH hits AS (SELECT rowid FROM pages_fts WHERE pages_fts MATCH ?) "
+            "SELECT p.date, p.doc, p.page, p.path, p.snippet "
+            "FROM hits "
+            "JOIN pages p ON p.id = hits.rowid" + where_sql + " "
+            "ORDER BY p.date ASC, p.doc ASC, p.page ASC "
+            "LIMIT ?"
+        )
+    # Older index (rowids not aligned); rebuilt by the next build_index.py run.
     where_sql = (" AND " + " AND ".join(where)) if where else ""
-
-    sql = (
+    return (
         "SELECT p.date, p.doc, p.page, p.path, p.snippet "
         "FROM pages_fts f "
         "JOIN pages p ON p.path = f.path "
@@ -71,13 +86,96 @@ def main() -> None:
         "LIMIT ?"
     )
 
-    qparams: list[object] = [q] + params + [int(args.limit)]
 
-    rows = con.execute(sql, qparams).fetchall()
-    for r in rows:
-        d, doc, page, path, snip = r
-        print(f"{d} {doc}/page_{int(page):04d} :: {snip}")
-        print(f"  {path}")
+def _query_params(q: str, date_from: str | None, date_to: str | None, limit: int) -> list[object]:
+    params: list[object] = [q]
+    if date_from:
+        params.append(date_from)
+    if date_to:
+        params.append(date_to)
+    params.append(int(limit))
+    return params
+
+
+class Searcher:
+    """Long-lived query handle for repeated searches (e.g. from a bot).
+
+    The SQL for the four date-filter variants is built once; sqlite3's
+    per-connection statement cache then reuses the compiled statements, so
+    repeated queries skip SQLite's parser/planner. Identical queries are
+    answered from an LRU cache, which is dropped whenever the index changes
+    (PRAGMA data_version).
+
+        s = Searcher("/path/to/journal_index.sqlite")
+        for date, doc, page, path, snippet in s.search("taxes", "2025-12-01"):
+            ...
+    """
+
+    def __init__(self, db_path: str, *, cache_size: int = 256) -> None:
+        self.con = _connect_readonly(_coerce_db_path(db_path))
+        rowid_join = (
+            int(self.con.execute("PRAGMA user_version").fetchone()[0]) >= ROWID_JOIN_SCHEMA_VERSION
+        )
+        self._sql = {
+            (f, t): _build_sql(rowid_join, f, t) for f in (False, True) for t in (False, True)
+        }
+        self._data_version = self._current_data_version()
+        self._cached_search = functools.lru_cache(maxsize=cache_size)(self._search)
+
+    def _current_data_version(self) -> int:
+        return int(self.con.execute("PRAGMA data_version").fetchone()[0])
+
+    def _search(
+        self, q: str, date_from: str | None, date_to: str | None, limit: int
+    ) -> tuple[tuple, ...]:
+        sql = self._sql[(bool(date_from), bool(date_to))]
+        return tuple(self.con.execute(sql, _query_params(q, date_from, date_to, limit)))
+
+    def search(
+        self,
+        q: str,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        limit: int = 10,
+    ) -> tuple[tuple, ...]:
+        """Return (date, doc, page, path, snippet) rows for an FTS query."""
+        version = self._current_data_version()
+        if version != self._data_version:
+            self._cached_search.cache_clear()
+            self._data_version = version
+        return self._cached_search(_coerce_fts_query(q), date_from, date_to, int(limit))
+
+    def close(self) -> None:
+        self._cached_search.cache_clear()
+        self.con.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", required=True)
+    ap.add_argument("--q", required=True, help="FTS query")
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--from", dest="date_from", default=None)
+    ap.add_argument("--to", dest="date_to", default=None)
+    args = ap.parse_args()
+
+    db_path = _coerce_db_path(args.db)
+    q = _coerce_fts_query(args.q)
+
+    con = _connect_readonly(db_path)
+
+    rowid_join = int(con.execute("PRAGMA user_version").fetchone()[0]) >= ROWID_JOIN_SCHEMA_VERSION
+    sql = _build_sql(rowid_join, bool(args.date_from), bool(args.date_to))
+    qparams = _query_params(q, args.date_from, args.date_to, args.limit)
+
+    # Stream rows off the cursor; flush output in batches of OUTPUT_FLUSH_ROWS.
+    out: list[str] = []
+    for d, doc, page, path, snip in con.execute(sql, qparams):
+        out.append(f"{d} {doc}/page_{int(page):04d} :: {snip}\n  {path}\n")
+        if len(out) >= OUTPUT_FLUSH_ROWS:
+            sys.stdout.write("".join(out))
+            out.clear()
+    sys.stdout.write("".join(out))
 
     con.close()
 
@@ -16,9 +16,16 @@ Example:
 from __future__ import annotations
 
 import argparse
-import json
+import sys
 from pathlib import Path
 
+# Make this script runnable without installing the package (no PYTHONPATH required)
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from msjournal_reader.fast import json_loads  # noqa: E402
+
 
 def load_jsonl(p: Path) -> list[dict]:
     items: list[dict] = []
@@ -28,7 +35,7 @@ def load_jsonl(p: Path) -> list[dict]:
         line = line.strip()
         if not line:
             continue
-        items.append(json.loads(line))
+        items.append(json_loads(line))
     return items
 
 
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
-"""Interactive reviewer for mined OCR correction candidates.
+r"""Interactive reviewer for mined OCR correction candidates.
 
 Reads a JSONL queue produced by scripts/mine_suspects.py and lets you accept or
 edit a replacement. Accepted items are appended to a regex corrections map and
 marked as reviewed in a state file so they don't get re-suggested.
 
 Default behavior is deliberately conservative:
-- It only writes *word-boundary* regex replacements: ["\\bTOKEN\\b", "REPL"].
+- It only writes *word-boundary* regex replacements: \bTOKEN\b -> REPL.
 - It lowercases the token for matching (token itself is stored lowercased by the miner).
 
 Files (defaults):
@@ -30,17 +30,25 @@ import sys
 import time
 from pathlib import Path
 
+# Make this script runnable without installing the package (no PYTHONPATH required)
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from msjournal_reader.fast import json_dumps, json_loads  # noqa: E402
+from msjournal_reader.fileio import atomic_write_text  # noqa: E402
+
 
 def load_json(path: Path, default):
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return json_loads(path.read_bytes())
     except FileNotFoundError:
         return default
 
 
 def save_json(path: Path, obj) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    atomic_write_text(path, json_dumps(obj, indent=True) + "\n")
 
 
 def load_jsonl(path: Path) -> list[dict]:
@@ -51,14 +59,16 @@ def load_jsonl(path: Path) -> list[dict]:
         line = line.strip()
         if not line:
             continue
-        items.append(json.loads(line))
+        items.append(json_loads(line))
     return items
 
 
-def append_regex_rule(corrections: list, token: str, repl: str) -> None:
+def append_regex_rule(corrections: list, token: str, repl: str) -> str:
+    """Append a whole-word rule for *token* and return its pattern."""
     # exact word-boundary match; escape token just in case
-    pat = r"\\b" + re.escape(token) + r"\\b"
+    pat = r"\b" + re.escape(token) + r"\b"
     corrections.append([pat, repl])
+    return pat
 
 
 def main() -> None:
@@ -155,14 +165,14 @@ def main() -> None:
             n += 1
             continue
 
-        append_regex_rule(corrections, token, repl)
+        pat = append_regex_rule(corrections, token, repl)
         reviewed_tokens[token] = {
             "status": "accepted",
             "replacement": repl,
             "ts": int(time.time()),
             "id": it.get("id"),
         }
-        print(f"Added rule: \\b{token}\\b -> {repl}")
+        print(f"Added rule: {pat} -> {repl}")
         n += 1
 
     if args.non_interactive:
@@ -20,26 +20,176 @@ Example:
 from __future__ import annotations
 
 import argparse
+import functools
+import json
+import os
 import re
+import string
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
-from msjournal_reader.corrections import apply_corrections
+from msjournal_reader.corrections import (
+    CompiledCorrections,
+    apply_corrections_compiled,
+    load_corrections,
+)
 
 
-def read_body(md_path: Path) -> tuple[str, str]:
-    raw = md_path.read_text(encoding="utf-8", errors="replace")
-    lines = raw.splitlines()
-    if lines and lines[0].lstrip().startswith("# Page"):
-        header = lines[0].rstrip() + "\n\n"
-        body = "\n".join(lines[1:]).lstrip("\n")
-        return header, body
+def split_body(raw: str) -> tuple[str, str]:
+    nl = raw.find("\n")
+    first = raw if nl < 0 else raw[:nl]
+    if first.lstrip().startswith("# Page"):
+        # Slice the body straight out of raw: skip the blank lines after the
+        # heading and one trailing newline (what splitlines + join dropped).
+        start = nl + 1 if nl >= 0 else len(raw)
+        while raw.startswith("\n", start):
+            start += 1
+        end = len(raw) - 1 if raw.endswith("\n") else len(raw)
+        return first.rstrip() + "\n\n", raw[start:end]
     return "", raw
 
 
+# Backreferences / conditional group references / named groups / global
+# inline flags can't be wrapped in a merged alternation (group numbers shift,
+# names collide); such rules are checked on their own.
+_UNMERGEABLE_RE = re.compile(r"\\[1-9]|\(\?\(|\(\?P[<=]|^\(\?[aiLmsux]+\)")
+
+
+def build_matcher(
+    corrections: CompiledCorrections,
+) -> tuple[re.Pattern[str] | None, tuple[re.Pattern[str], ...]]:
+    """Merge every rule into one alternation, so a page is scanned once to
+    decide whether any rule can fire.
+
+    Returns (merged, fallback): rules that can't be merged are returned in
+    *fallback* and must be searched individually.
+    """
+    merged_src: list[str] = []
+    fallback: list[re.Pattern[str]] = []
+    for patt, _repl in corrections.rules:
+        if _UNMERGEABLE_RE.search(patt.pattern):
+            fallback.append(patt)
+        else:
+            merged_src.append(f"(?:{patt.pattern})")
+    if not merged_src:
+        return None, tuple(fallback)
+    try:
+        merged = re.compile("|".join(merged_src), re.IGNORECASE)
+    except re.error:
+        return None, tuple(p for p, _ in corrections.rules)
+    return merged, tuple(fallback)
+
+
+def _any_rule_matches(
+    body: str, merged: re.Pattern[str] | None, fallback: tuple[re.Pattern[str], ...]
+) -> bool:
+    # Rules only cascade off earlier rewrites, so if nothing matches the
+    # original body, applying the rules in order can't change it either.
+    if merged is not None and merged.search(body):
+        return True
+    return any(p.search(body) for p in fallback)
+
+
+def _iter_pages(exports_base: Path):
+    """Yield page_*.md paths in (doc, page) order.
+
+    os.scandir gets entry types from the directory read itself, so this
+    doesn't stat every doc dir and page the way iterdir()/is_dir()/glob() do.
+    """
+    with os.scandir(exports_base) as it:
+        docs = sorted(
+            (e for e in it if e.is_dir() and e.name not in {"yearly", "index"}),
+            key=lambda e: e.name,
+        )
+    for doc in docs:
+        with os.scandir(doc.path) as it:
+            names = sorted(
+                e.name for e in it if e.name.startswith("page_") and e.name.endswith(".md")
+            )
+        for name in names:
+            yield Path(doc.path, name)
+
+
 def write_page(md_path: Path, header: str, body: str) -> None:
     md_path.write_text((header + body.strip() + "\n").lstrip("\n"), encoding="utf-8")
 
 
+# ASCII letters that re.IGNORECASE also matches against non-ASCII characters.
+_UNICODE_FOLD_LETTERS = frozenset("iks")
+_ASCII_WORD_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+
+def _bytes_prefilter_safe(token: str) -> bool:
+    """True if a bytes search for *token* finds every page the str pattern does.
+
+    Non-ASCII UTF-8 bytes are never word characters, so next to an ASCII
+    word character the bytes \\b matches wherever the str \\b does (and more).
+    That fails when the token starts or ends with a non-word character (e.g.
+    "dont'" before "é", a word character only to the str pattern), and for
+    letters a case-insensitive str pattern also matches outside ASCII
+    (U+0130/U+0131 for i, U+212A KELVIN SIGN for k, U+017F LONG S for s).
+    """
+    return (
+        token.isascii()
+        and token[0] in _ASCII_WORD_CHARS
+        and token[-1] in _ASCII_WORD_CHARS
+        and not _UNICODE_FOLD_LETTERS.intersection(token.lower())
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_state(
+    token: str, corr_path: str
+) -> tuple[
+    re.Pattern[bytes] | None,
+    re.Pattern[str],
+    CompiledCorrections,
+    re.Pattern[str] | None,
+    tuple[re.Pattern[str], ...],
+]:
+    """Compile the token pattern + corrections once per process (workers included)."""
+    pat = re.compile(r"\b" + re.escape(token) + r"\b", re.IGNORECASE)
+    # Where it can't miss a match, search the undecoded bytes first.
+    pat_b = (
+        re.compile(rb"\b" + re.escape(token.encode("ascii")) + rb"\b", re.IGNORECASE)
+        if _bytes_prefilter_safe(token)
+        else None
+    )
+    corrections = load_corrections(Path(corr_path))
+    merged, fallback = build_matcher(corrections)
+    return pat_b, pat, corrections, merged, fallback
+
+
+def _rewrite_one(md: Path, token: str, corr_path: str) -> bool:
+    """Re-apply corrections to one page if it contains *token*; True if rewritten."""
+    pat_b, pat, corrections, merged, fallback = _compiled_state(token, corr_path)
+    try:
+        raw = md.read_bytes()
+    except FileNotFoundError:
+        return False
+
+    # Most pages don't contain the token: reject them before decoding.
+    if pat_b is not None and not pat_b.search(raw):
+        return False
+    # Same newline translation read_text() would have done.
+    text = raw.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    header, body = split_body(text)
+
+    if not pat.search(body):
+        return False
+    if not _any_rule_matches(body, merged, fallback):
+        return False
+
+    new_body = apply_corrections_compiled(body, corrections)
+    if new_body.strip() == body.strip():
+        return False
+
+    write_page(md, header, new_body)
+    return True
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--token", required=True)
@@ -52,6 +202,17 @@ def main() -> None:
         default="user_corrections/local/pipeline_paths.json",
         help="JSON file with exports_base/yearly_out/index_db defaults.",
     )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for the page rewrite (default: CPU count; 1 = in-process).",
+    )
+    ap.add_argument(
+        "--full-index",
+        action="store_true",
+        help="Walk all pages for the index update instead of only the rewritten ones.",
+    )
     args = ap.parse_args()
 
     repo_root = Path(__file__).resolve().parents[1]
@@ -62,8 +223,6 @@ def main() -> None:
         cfg_path = repo_root / cfg_path
     cfg = {}
     if cfg_path.exists():
-        import json
-
         cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
 
     exports_base_raw = args.exports_base or cfg.get("exports_base")
@@ -84,65 +243,49 @@ def main() -> None:
     if not token:
         raise SystemExit("Empty token")
 
-    pat = re.compile(r"\\b" + re.escape(token) + r"\\b", re.IGNORECASE)
-
-    changed = 0
-    scanned = 0
+    # Fail fast on a bad corrections map before fanning out.
+    _compiled_state(token, str(corr_path))
 
-    for doc_dir in sorted([p for p in exports_base.iterdir() if p.is_dir()]):
-        if doc_dir.name in {"yearly", "index"}:
-            continue
-        for md in sorted(doc_dir.glob("page_*.md")):
-            scanned += 1
-            try:
-                header, body = read_body(md)
-            except FileNotFoundError:
-                continue
+    pages = list(_iter_pages(exports_base))
+    scanned = len(pages)
 
-            if not pat.search(body):
-                continue
+    # Pages are independent (read -> regex -> write), so fan out across
+    # processes; each worker compiles the rules once via _compiled_state.
+    worker_args = (pages, repeat(token), repeat(str(corr_path)))
+    if args.workers == 1:
+        results = list(map(_rewrite_one, *worker_args))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as ex:
+            results = list(ex.map(_rewrite_one, *worker_args, chunksize=64))
 
-            new_body = apply_corrections(body, corr_path)
-            if new_body.strip() == body.strip():
-                continue
+    changed_pages = [md for md, rewritten in zip(pages, results) if rewritten]
 
-            write_page(md, header, new_body)
-            changed += 1
+    print(f"OK: rewrote pages containing '{token}': changed={len(changed_pages)} scanned={scanned}")
 
-    print(f"OK: rewrote pages containing '{token}': changed={changed} scanned={scanned}")
+    # Rebuild derived artifacts if requested (in-process, no runpy re-exec)
+    if args.yearly_out or args.index_db:
+        scripts_dir = str(Path(__file__).resolve().parent)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
 
-    # Rebuild derived artifacts if requested
     if args.yearly_out:
-        import runpy, sys
-
-        original_argv = list(sys.argv)
-        try:
-            sys.argv = [
-                "build_year_exports.py",
-                "--exports-base",
-                str(exports_base),
-                "--out-dir",
-                str(Path(args.yearly_out).expanduser().resolve()),
-            ]
-            runpy.run_path(str(Path(__file__).resolve().parent / "build_year_exports.py"), run_name="__main__")
-        finally:
-            sys.argv = original_argv
+        from build_year_exports import run as run_yearly
+
+        run_yearly(exports_base, Path(args.yearly_out).expanduser().resolve())
 
     if args.index_db:
-        import runpy, sys
-
-        original_argv = list(sys.argv)
-        try:
-            sys.argv = [
-                "build_index.py",
-                "--exports-base",
-                str(exports_base),
-                "--db",
-                str(Path(args.index_db).expanduser().resolve()),
-            ]
-            runpy.run_path(str(Path(__file__).resolve().parent / "build_index.py"), run_name="__main__")
-        finally:
-            sys.argv = original_argv
+        import build_index
+
+        index_db = Path(args.index_db).expanduser().resolve()
+        # Only the rewritten pages changed; re-index just those unless asked
+        # for a full pass (or there's no usable index yet).
+        updated = None
+        if not args.full_index:
+            updated = build_index.index_update_paths(index_db, changed_pages)
+        if updated is None:
+            build_index.run(exports_base, index_db)
+        else:
+            print(f"OK: index at {index_db} (incremental, updated={updated})")
 
 
 if __name__ == "__main__":
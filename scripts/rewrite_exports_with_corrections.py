@@ -2,7 +2,7 @@
 """Rewrite exported page markdown by re-applying the current corrections map.
 
 This is intentionally OCR-free: it does not touch the .ink source or rerun OCR.
-It simply re-applies msjournal_reader.corrections.apply_corrections() to the
+It simply re-applies the msjournal_reader.corrections map to the
 existing exported text to quickly propagate new correction rules.
 
 It preserves the `# Page N` header if present.
@@ -13,31 +13,121 @@ Typical usage (defaults read from user_corrections/local/pipeline_paths.json):
 
 You can also rebuild derived artifacts:
   --rebuild-yearly / --rebuild-index
+
+Pages already up to date with the current map are remembered per doc dir in
+.corrections_state.json (msjournal_reader.corrections_state, by size/mtime)
+and skipped on later runs.
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
-from msjournal_reader.corrections import apply_corrections
+from msjournal_reader.corrections import (
+    CompiledCorrections,
+    apply_corrections_compiled,
+    load_corrections,
+)
+from msjournal_reader.corrections_state import (
+    STATE_NAME,
+    corrections_hash,
+    load_doc_state,
+    save_doc_state,
+)
 
 
 def read_body(md_path: Path) -> tuple[str, str]:
     raw = md_path.read_text(encoding="utf-8", errors="replace")
-    lines = raw.splitlines()
-    if lines and lines[0].lstrip().startswith("# Page"):
-        header = lines[0].rstrip() + "\n\n"
-        body = "\n".join(lines[1:]).lstrip("\n")
-        return header, body
+    nl = raw.find("\n")
+    first = raw if nl < 0 else raw[:nl]
+    if first.lstrip().startswith("# Page"):
+        # Slice the body straight out of raw: skip the blank lines after the
+        # heading and one trailing newline (what splitlines + join dropped).
+        start = nl + 1 if nl >= 0 else len(raw)
+        while raw.startswith("\n", start):
+            start += 1
+        end = len(raw) - 1 if raw.endswith("\n") else len(raw)
+        return first.rstrip() + "\n\n", raw[start:end]
     return "", raw
 
 
+def _has_ocr_text(body: str) -> bool:
+    # Same notion of "empty" as update_exports (which retries those pages).
+    b = body.strip()
+    return bool(b) and not b.lower().startswith("(see attached image")
+
+
 def write_page(md_path: Path, header: str, body: str) -> None:
     md_path.write_text((header + body.strip() + "\n").lstrip("\n"), encoding="utf-8")
 
 
+@functools.lru_cache(maxsize=4)
+def _compiled(corr_path: str) -> CompiledCorrections:
+    """Load + compile the map once per process (workers included)."""
+    return load_corrections(Path(corr_path))
+
+
+def _process_page(
+    md: Path, corr_path: str, cached: list[int] | None
+) -> tuple[bool, bool, list[int] | None]:
+    """Re-apply corrections to one page.
+
+    Returns (rewritten, skipped, state_entry): skipped if *cached* still
+    matches the page's [size, mtime_ns]; state_entry is what to record for
+    the page in the doc's sidecar (None = nothing).
+    """
+    try:
+        st = md.stat()
+    except FileNotFoundError:
+        return False, False, None
+    entry = [st.st_size, st.st_mtime_ns]
+    if cached == entry:
+        return False, True, entry
+    try:
+        header, body = read_body(md)
+    except FileNotFoundError:
+        return False, False, None
+    if not body.strip():
+        return False, False, None
+    new_body = apply_corrections_compiled(body, _compiled(corr_path))
+    if new_body.strip() == body.strip():
+        # Only fixed points are recorded: a rewritten page is checked
+        # once more next run, since rules can cascade.
+        return False, False, entry if _has_ocr_text(body) else None
+    write_page(md, header, new_body)
+    return True, False, None
+
+
+def _scan_exports(exports_base: Path) -> list[tuple[Path, list[Path]]]:
+    """[(doc_dir, [page_*.md, ...]), ...] in (doc, page) order.
+
+    os.scandir reports entry types from the directory read itself, so this
+    doesn't stat every doc dir and page the way iterdir()/is_dir()/glob() do.
+    """
+    with os.scandir(exports_base) as it:
+        docs = sorted(
+            (e for e in it if e.is_dir() and e.name not in {"yearly", "index"}),
+            key=lambda e: e.name,
+        )
+    out: list[tuple[Path, list[Path]]] = []
+    for doc in docs:
+        with os.scandir(doc.path) as it:
+            names = sorted(
+                e.name
+                for e in it
+                if e.name.startswith("page_") and e.name.endswith(".md") and e.is_file()
+            )
+        doc_dir = Path(doc.path)
+        out.append((doc_dir, [doc_dir / name for name in names]))
+    return out
+
+
 def load_paths(repo_root: Path, paths_config: str) -> dict:
     p = Path(paths_config)
     if not p.is_absolute():
@@ -47,41 +137,19 @@ def load_paths(repo_root: Path, paths_config: str) -> dict:
     return json.loads(p.read_text(encoding="utf-8"))
 
 
-def rebuild_yearly(repo_root: Path, exports_base: Path, yearly_out: Path) -> None:
-    import runpy, sys
+def rebuild_yearly(exports_base: Path, yearly_out: Path) -> None:
+    from build_year_exports import run as run_yearly
 
-    original_argv = list(sys.argv)
-    try:
-        sys.argv = [
-            "build_year_exports.py",
-            "--exports-base",
-            str(exports_base),
-            "--out-dir",
-            str(yearly_out),
-        ]
-        runpy.run_path(str(repo_root / "scripts" / "build_year_exports.py"), run_name="__main__")
-    finally:
-        sys.argv = original_argv
-
-
-def rebuild_index(repo_root: Path, exports_base: Path, index_db: Path) -> None:
-    import runpy, sys
-
-    original_argv = list(sys.argv)
-    try:
-        sys.argv = [
-            "build_index.py",
-            "--exports-base",
-            str(exports_base),
-            "--db",
-            str(index_db),
-        ]
-        runpy.run_path(str(repo_root / "scripts" / "build_index.py"), run_name="__main__")
-    finally:
-        sys.argv = original_argv
-
-
-def main() -> None:
+    run_yearly(exports_base, yearly_out)
+
+
+def rebuild_index(exports_base: Path, index_db: Path) -> None:
+    from build_index import run as run_index
+
+    run_index(exports_base, index_db)
+
+
+def main(argv: list[str] | None = None) -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--corrections-map", required=True)
     ap.add_argument("--exports-base")
@@ -90,7 +158,18 @@ def main() -> None:
     ap.add_argument("--paths-config", default="user_corrections/local/pipeline_paths.json")
     ap.add_argument("--rebuild-yearly", action="store_true")
     ap.add_argument("--rebuild-index", action="store_true")
-    args = ap.parse_args()
+    ap.add_argument(
+        "--no-state",
+        action="store_true",
+        help=f"Re-check every page; don't read or write the per-doc {STATE_NAME}.",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for the page rewrite (default: CPU count; 1 = in-process).",
+    )
+    args = ap.parse_args(argv)
 
     repo_root = Path(__file__).resolve().parents[1]
     cfg = load_paths(repo_root, args.paths_config)
@@ -109,39 +188,67 @@ def main() -> None:
     if not corr.is_absolute():
         corr = repo_root / corr
     corr = corr.expanduser().resolve()
+    # Fail fast on a bad corrections map before fanning out.
+    _compiled(str(corr))
+
+    corr_hash = corrections_hash(corr)
+
+    jobs: list[tuple[Path, Path]] = []
+    states: dict[Path, dict] = {}
+    for doc_dir, mds in _scan_exports(exports_base):
+        states[doc_dir] = {} if args.no_state else load_doc_state(doc_dir)
+        jobs.extend((doc_dir, md) for md in mds)
+    scanned = len(jobs)
+
+    # Pages are independent (read -> regex -> write), so fan out across
+    # processes; each worker compiles the map once via _compiled.
+    worker_args = (
+        [md for _, md in jobs],
+        repeat(str(corr)),
+        [
+            (states[d].get("pages") or {}).get(md.name)
+            if states[d].get("corrections_hash") == corr_hash
+            else None
+            for d, md in jobs
+        ],
+    )
+    if args.workers == 1:
+        results = list(map(_process_page, *worker_args))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as ex:
+            results = list(ex.map(_process_page, *worker_args, chunksize=64))
 
     changed = 0
-    scanned = 0
-
-    for doc_dir in sorted([p for p in exports_base.iterdir() if p.is_dir()]):
-        if doc_dir.name in {"yearly", "index"}:
-            continue
-        for md in sorted(doc_dir.glob("page_*.md")):
-            scanned += 1
-            try:
-                header, body = read_body(md)
-            except FileNotFoundError:
-                continue
-            if not body.strip():
-                continue
-            new_body = apply_corrections(body, corr)
-            if new_body.strip() == body.strip():
-                continue
-            write_page(md, header, new_body)
-            changed += 1
-
-    print(f"OK: rewrite_exports_with_corrections changed={changed} scanned={scanned}")
+    skipped = 0
+    new_pages: dict[Path, dict[str, list[int]]] = {d: {} for d in states}
+    for (doc_dir, md), (rewritten, was_skipped, entry) in zip(jobs, results):
+        changed += rewritten
+        skipped += was_skipped
+        if entry is not None:
+            new_pages[doc_dir][md.name] = entry
+
+    if not args.no_state:
+        for doc_dir, old in states.items():
+            state = {"corrections_hash": corr_hash, "pages": new_pages[doc_dir]}
+            # Usually nothing changed since the last run; leave the file alone then.
+            if state != old:
+                save_doc_state(doc_dir, state)
+
+    print(
+        f"OK: rewrite_exports_with_corrections changed={changed} scanned={scanned} "
+        f"skipped_unchanged={skipped}"
+    )
 
     if args.rebuild_yearly:
         if not yearly_out:
             raise SystemExit("--rebuild-yearly requires yearly_out (arg or paths-config)")
-        rebuild_yearly(repo_root, exports_base, yearly_out)
+        rebuild_yearly(exports_base, yearly_out)
         print("OK: rebuilt yearly")
 
     if args.rebuild_index:
         if not index_db:
             raise SystemExit("--rebuild-index requires index_db (arg or paths-config)")
-        rebuild_index(repo_root, exports_base, index_db)
+        rebuild_index(exports_base, index_db)
         print("OK: rebuilt index")
 
 
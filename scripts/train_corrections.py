@@ -13,15 +13,17 @@ from __future__ import annotations
 import argparse
 import json
 import re
+from collections import Counter
+from itertools import groupby
 from pathlib import Path
 
-from jiwer import process_words
+from rapidfuzz.distance import Levenshtein
 
 
-def normalize_for_training(s: str) -> str:
-    s = s.lower()
-    s = s.replace("’", "'")
-    circled = {
+# Curly apostrophe and circled digits, folded in one str.translate pass.
+_TRAINING_TRANS = str.maketrans(
+    {
+        "’": "'",
         "①": "1",
         "②": "2",
         "③": "3",
@@ -33,13 +35,35 @@ def normalize_for_training(s: str) -> str:
         "⑨": "9",
         "⑩": "10",
     }
-    for k, v in circled.items():
-        s = s.replace(k, v)
-    s = re.sub(r"[^a-z0-9\s']+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+)
+_NON_WORD_RE = re.compile(r"[^a-z0-9\s']+")
+_WS_RE = re.compile(r"\s+")
+_PAGE_ID_RE = re.compile(r"page[-_](\d{4})")
+
+
+def normalize_for_training(s: str) -> str:
+    s = s.lower().translate(_TRAINING_TRANS)
+    s = _NON_WORD_RE.sub(" ", s)
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
+def word_substitutions(gold: str, hyp: str):
+    """Yield (ref_words, hyp_words) for each substituted span of a word alignment.
+
+    Words are mapped to int ids so rapidfuzz aligns whole words (the same
+    alignment jiwer.process_words produces, without its per-call overhead).
+    """
+    ref_words = gold.split()
+    hyp_words = hyp.split()
+    vocab: dict[str, int] = {}
+    ref_ids = [vocab.setdefault(w, len(vocab)) for w in ref_words]
+    hyp_ids = [vocab.setdefault(w, len(vocab)) for w in hyp_words]
+    for op in Levenshtein.opcodes(ref_ids, hyp_ids):
+        if op.tag == "replace":
+            yield ref_words[op.src_start : op.src_end], hyp_words[op.dest_start : op.dest_end]
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--gold-dir", required=True)
@@ -54,10 +78,10 @@ def main() -> None:
 
     exclude = {p.strip() for p in (args.exclude_pages or "").split(",") if p.strip()}
 
-    counts: dict[tuple[str, str], int] = {}
+    counts: Counter[tuple[str, str]] = Counter()
 
     for gold_path in sorted(gold_dir.glob("*.txt")):
-        m = re.search(r"page[-_](\d{4})", gold_path.name)
+        m = _PAGE_ID_RE.search(gold_path.name)
         if not m:
             continue
         page = m.group(1)
@@ -78,17 +102,12 @@ def main() -> None:
 
         gold = normalize_for_training(gold_raw)
         hyp = normalize_for_training(hyp_raw)
+        if gold == hyp:
+            # Already correct: no substitutions to learn, skip the alignment.
+            continue
 
-        out = process_words(gold, hyp)
-        ref_words = out.references[0]
-        hyp_words = out.hypotheses[0]
-
-        for chunk in out.alignments[0]:
-            if chunk.type != "substitute":
-                continue
-            r = ref_words[chunk.ref_start_idx : chunk.ref_end_idx]
-            h = hyp_words[chunk.hyp_start_idx : chunk.hyp_end_idx]
-
+        page_subs: list[tuple[str, str]] = []
+        for r, h in word_substitutions(gold, hyp):
             if not (1 <= len(r) <= 4 and 1 <= len(h) <= 4):
                 continue
 
@@ -99,15 +118,14 @@ def main() -> None:
             if len(right) <= 2 or len(wrong) <= 2:
                 continue
 
-            counts[(wrong, right)] = counts.get((wrong, right), 0) + 1
+            page_subs.append((wrong, right))
 
-    by_wrong: dict[str, dict[str, int]] = {}
-    for (wrong, right), c in counts.items():
-        by_wrong.setdefault(wrong, {})[right] = c
+        counts.update(page_subs)
 
+    # Most frequent right per wrong (ties -> alphabetically first right).
     mapping: dict[str, str] = {}
-    for wrong, rights in by_wrong.items():
-        best_right, best_c = sorted(rights.items(), key=lambda kv: (-kv[1], kv[0]))[0]
+    for wrong, group in groupby(sorted(counts.items()), key=lambda kv: kv[0][0]):
+        (_, best_right), best_c = min(group, key=lambda kv: (-kv[1], kv[0][1]))
         if best_c >= args.min_count:
             mapping[wrong] = best_right
 
@@ -1,18 +1,25 @@
 #!/usr/bin/env python3
-"""Train a per-user neural post-corrector (OCR hyp -> gold) using ByT5.
+"""Train a per-user neural post-corrector (OCR hyp -> gold) using T5 / ByT5.
 
 This does NOT change the OCR engine. It learns your idiosyncrasies as a rewrite layer.
 
+Tokenizer kinds:
+- byte (default): ByT5 (google/byt5-small). Sees every character, newlines
+  included.
+- spm: subword T5 (t5-small). ~4x shorter sequences than bytes, so much faster
+  to train, but only usable when T5's vocabulary covers the corpus: the script
+  refuses pages with characters it can't represent (e.g. { } < ~), and line
+  breaks go through a <nl> token added to the tokenizer.
+
 Data convention:
 - gold pages: gold/*page-0001*.txt (or page_0001, page-0001, page_0001)
 - hyp pages : <hyp-dir>/page_0001.md
 
 Example:
-  python3 scripts/train_postcorrector_byt5.py \
+  PYTHONPATH=. python3 scripts/train_postcorrector_byt5.py \
     --gold-dir gold \
     --hyp-dir out/journal-feb-2026 \
     --out-dir user_corrections/local/models/byt5 \
-    --model google/byt5-small \
     --epochs 10
 
 Requires optional deps:
@@ -22,13 +29,22 @@ Requires optional deps:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import re
 from pathlib import Path
 
+from msjournal_reader.postcorrector import NEWLINE_TOKEN, decode_lines
+
+DEFAULT_MODELS = {"spm": "t5-small", "byte": "google/byt5-small"}
+
+
+_PAGE_ID_RE = re.compile(r"page[-_](\d{4})")
+
 
 def _page_id(name: str) -> str | None:
-    m = re.search(r"page[-_](\d{4})", name)
+    m = _PAGE_ID_RE.search(name)
     return m.group(1) if m else None
 
 
@@ -55,20 +71,59 @@ def load_pairs(gold_dir: Path, hyp_dir: Path) -> list[dict[str, str]]:
     return pairs
 
 
+def _unrepresentable_chars(tok, pairs: list[dict[str, str]]) -> list[str]:
+    """Characters of the corpus that *tok* can only encode as <unk>."""
+    chars = {c for p in pairs for t in (p["input"], p["target"]) for c in t if not c.isspace()}
+    unk = tok.unk_token_id
+    return sorted(c for c in chars if unk in tok(c, add_special_tokens=False)["input_ids"])
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--gold-dir", required=True)
     ap.add_argument("--hyp-dir", required=True)
     ap.add_argument("--out-dir", required=True, help="Where to save the fine-tuned model")
-    ap.add_argument("--model", default="google/byt5-small")
+    ap.add_argument(
+        "--tokenizer-kind",
+        choices=["spm", "byte"],
+        default="byte",
+        help="byte = ByT5 (default), spm = subword T5 (faster; needs vocab coverage)",
+    )
+    ap.add_argument("--model", default=None, help="Default: google/byt5-small (byte) / t5-small (spm)")
     ap.add_argument("--epochs", type=int, default=8)
     ap.add_argument("--lr", type=float, default=5e-4)
-    ap.add_argument("--batch-size", type=int, default=1)
-    ap.add_argument("--max-source-length", type=int, default=1024)
-    ap.add_argument("--max-target-length", type=int, default=1024)
+    ap.add_argument("--batch-size", type=int, default=4)
+    ap.add_argument(
+        "--grad-accum",
+        type=int,
+        default=1,
+        help="Gradient accumulation steps (raise if --batch-size doesn't fit in memory)",
+    )
+    ap.add_argument("--max-source-length", type=int, default=None, help="Default: 1024 (byte) / 512 (spm)")
+    ap.add_argument("--max-target-length", type=int, default=None, help="Default: 1024 (byte) / 512 (spm)")
     ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument(
+        "--fp16",
+        action="store_true",
+        help="Train in fp16 on GPUs without bf16 (T5 models can overflow to NaN in fp16)",
+    )
+    ap.add_argument(
+        "--gradient-checkpointing",
+        action="store_true",
+        help="Recompute activations in the backward pass to fit larger batches on GPU",
+    )
     args = ap.parse_args()
 
+    byte_level = args.tokenizer_kind == "byte"
+    if args.model is None:
+        args.model = DEFAULT_MODELS[args.tokenizer_kind]
+    # Subword tokens cover roughly the same text in half the positions.
+    default_len = 1024 if byte_level else 512
+    if args.max_source_length is None:
+        args.max_source_length = default_len
+    if args.max_target_length is None:
+        args.max_target_length = default_len
+
     gold_dir = Path(args.gold_dir)
     hyp_dir = Path(args.hyp_dir)
     out_dir = Path(args.out_dir)
@@ -84,32 +139,94 @@ def main() -> None:
     # Lazy imports so base install works
     import numpy as np  # type: ignore
     import torch  # type: ignore
-    from datasets import Dataset  # type: ignore
+    from datasets import Dataset, load_from_disk  # type: ignore
     from transformers import (  # type: ignore
         AutoModelForSeq2SeqLM,
         AutoTokenizer,
         DataCollatorForSeq2Seq,
         Seq2SeqTrainer,
         Seq2SeqTrainingArguments,
+        T5TokenizerFast,
         set_seed,
     )
 
     set_seed(int(args.seed))
 
-    ds = Dataset.from_list(pairs)
-
-    tok = AutoTokenizer.from_pretrained(args.model)
+    tok = (AutoTokenizer if byte_level else T5TokenizerFast).from_pretrained(args.model)
     model = AutoModelForSeq2SeqLM.from_pretrained(args.model)
 
-    def preprocess(ex):
-        x = tok(ex["input"], max_length=int(args.max_source_length), truncation=True)
-        y = tok(ex["target"], max_length=int(args.max_target_length), truncation=True)
+    if not byte_level:
+        missing = _unrepresentable_chars(tok, pairs)
+        if missing:
+            raise SystemExit(
+                f"{args.model} can't represent {len(missing)} character(s) in these pages "
+                f"({''.join(missing[:20])}); use --tokenizer-kind byte"
+            )
+        # T5's SentencePiece normalization drops line breaks: carry them as an
+        # added token instead (PostCorrector maps it back).
+        tok.add_tokens([NEWLINE_TOKEN])
+        model.resize_token_embeddings(len(tok))
+
+    def encode_lines(texts: list[str]) -> list[str]:
+        return texts if byte_level else [t.replace("\n", NEWLINE_TOKEN) for t in texts]
+
+    def preprocess(exs):
+        x = tok(encode_lines(exs["input"]), max_length=int(args.max_source_length), truncation=True)
+        y = tok(encode_lines(exs["target"]), max_length=int(args.max_target_length), truncation=True)
         x["labels"] = y["input_ids"]
+        # Pages vary a lot in length; batching similar lengths together
+        # (group_by_length) keeps per-batch padding, and thus wasted compute, small.
+        x["length"] = [len(ids) for ids in x["input_ids"]]
         return x
 
-    tds = ds.map(preprocess, remove_columns=list(ds.features))
+    # Tokenized dataset is cached next to the model, keyed on everything that
+    # affects it, so re-training on the same pages skips tokenization.
+    tok_key = hashlib.sha1(
+        json.dumps(
+            [
+                pairs,
+                args.tokenizer_kind,
+                args.model,
+                int(args.max_source_length),
+                int(args.max_target_length),
+            ]
+        ).encode("utf-8")
+    ).hexdigest()
+    tok_dir = out_dir / "tokenized"
+    tok_key_path = tok_dir / "key.txt"
+    if tok_key_path.exists() and tok_key_path.read_text(encoding="utf-8").strip() == tok_key:
+        tds = load_from_disk(str(tok_dir / "data"))
+    else:
+        ds = Dataset.from_list(pairs)
+        tds = ds.map(
+            preprocess,
+            batched=True,
+            batch_size=64,
+            # Worker processes only pay off once there are a few batches.
+            num_proc=max(1, min(8, os.cpu_count() or 1, len(pairs) // 64)),
+            remove_columns=list(ds.features),
+        )
+        tds.save_to_disk(str(tok_dir / "data"))
+        tok_key_path.write_text(tok_key + "\n", encoding="utf-8")
+
+    # Pad each batch only to its longest sample, rounded up to a multiple of 8
+    # for tensor-core friendly shapes.
+    collator = DataCollatorForSeq2Seq(
+        tokenizer=tok, model=model, padding="longest", pad_to_multiple_of=8
+    )
 
-    collator = DataCollatorForSeq2Seq(tokenizer=tok, model=model)
+    # bf16 on GPUs that support it (Ampere+), else fp32: T5/ByT5 activations
+    # overflow in fp16, so that is only used when asked for.
+    cuda = torch.cuda.is_available()
+    bf16 = cuda and torch.cuda.is_bf16_supported()
+    fp16 = cuda and not bf16 and bool(args.fp16)
+    if bf16:
+        # Ampere+ also has TF32 matmuls for whatever still runs in fp32.
+        torch.backends.cuda.matmul.allow_tf32 = True
+    checkpointing = cuda and bool(args.gradient_checkpointing)
+    if checkpointing:
+        model.config.use_cache = False  # incompatible with gradient checkpointing
+        model.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
 
     # transformers v5 removed/renamed some TrainingArguments fields.
     # Keep args minimal so it works across versions.
@@ -118,11 +235,16 @@ def main() -> None:
         num_train_epochs=float(args.epochs),
         learning_rate=float(args.lr),
         per_device_train_batch_size=int(args.batch_size),
-        gradient_accumulation_steps=4,
+        gradient_accumulation_steps=int(args.grad_accum),
         logging_steps=5,
         save_strategy="no",
         report_to=[],
-        fp16=False,
+        bf16=bf16,
+        fp16=fp16,
+        optim="adamw_torch_fused" if cuda else "adamw_torch",
+        dataloader_pin_memory=cuda,
+        group_by_length=True,
+        length_column_name="length",
     )
 
     trainer = Seq2SeqTrainer(
@@ -134,16 +256,19 @@ def main() -> None:
 
     trainer.train()
 
+    # Re-enable the KV cache for inference (saved config + sanity check)
+    model.config.use_cache = True
+
     # Save model + tokenizer where the runtime loader expects it
     model.save_pretrained(str(out_dir))
     tok.save_pretrained(str(out_dir))
 
     # Tiny sanity check: run the first example
     ex0 = pairs[0]
-    inp = tok(ex0["input"], return_tensors="pt", truncation=True)
+    inp = tok(encode_lines([ex0["input"]])[0], return_tensors="pt", truncation=True).to(model.device)
     with torch.no_grad():
         out_ids = model.generate(**inp, max_new_tokens=256, do_sample=False)
-    out = tok.decode(out_ids[0], skip_special_tokens=True)
+    out = decode_lines(tok.decode(out_ids[0], skip_special_tokens=True))
 
     (out_dir / "sanity.txt").write_text(
         "INPUT:\n" + ex0["input"] + "\n\nPRED:\n" + out + "\n\nGOLD:\n" + ex0["target"] + "\n",
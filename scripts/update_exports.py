@@ -2,6 +2,7 @@
 """Incrementally export Microsoft Journal .ink files and update derived artifacts.
 
 - Skips pages already exported (non-empty page_XXXX.md)
+- Reuses earlier OCR results for identical page images (<exports-base>/.ocr_cache.sqlite)
 - Rebuilds combined.md per journal
 - Rebuilds yearly markdown files
 - Updates the SQLite FTS index
@@ -20,19 +21,27 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-from msjournal_reader.corrections import apply_corrections
+from msjournal_reader.corrections import apply_corrections_compiled, load_corrections
+from msjournal_reader.corrections_state import load_doc_state, page_state_matches
+from msjournal_reader.fast import new_hasher
 from msjournal_reader.ink import PNG_MAGIC
 from msjournal_reader.ocr.registry import build_engine
 
+_SLUG_SEP_RE = re.compile(r"[^a-z0-9]+")
+
 
 def slug(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
+    # Runs of separators (dashes included) collapse to one "-" in this one sub.
+    s = _SLUG_SEP_RE.sub("-", s.strip().lower()).strip("-")
     return s or "journal"
 
 
@@ -40,79 +49,555 @@ def load_config(p: Path) -> dict:
     return json.loads(p.read_text(encoding="utf-8"))
 
 
+def _page_body(raw: str) -> str:
+    # Only the first line matters; find it instead of splitting every line.
+    nl = raw.find("\n")
+    first = raw if nl < 0 else raw[:nl]
+    if first.lstrip().startswith("# Page"):
+        return raw[nl + 1 :].strip() if nl >= 0 else ""
+    return raw.strip()
+
+
 def _read_page_markdown_body(p: Path) -> str:
     """Return the OCR body from a per-page markdown export."""
-    raw = p.read_text(encoding="utf-8", errors="replace")
-    lines = raw.splitlines()
-    if lines and lines[0].lstrip().startswith("# Page"):
-        body = "\n".join(lines[1:]).lstrip("\n")
-    else:
-        body = raw
-    return body.strip()
+    return _page_body(p.read_text(encoding="utf-8", errors="replace"))
+
+
+# Legacy placeholder used by some pipelines
+PLACEHOLDER_PREFIX = "(see attached image"
+# Enough to get past the "# Page N" header into the body.
+EMPTY_CHECK_BYTES = 4096
 
 
 def _is_effectively_empty_page_export(p: Path) -> bool:
-    """Treat placeholder/empty exports as empty so we can retry OCR."""
+    """Treat placeholder/empty exports as empty so we can retry OCR.
+
+    Only the start of the file is read unless that's inconclusive.
+    """
     try:
-        body = _read_page_markdown_body(p)
+        with p.open("rb") as f:
+            head = f.read(EMPTY_CHECK_BYTES)
     except FileNotFoundError:
         return True
 
+    body = _page_body(head.decode("utf-8", errors="replace"))
+    if len(head) == EMPTY_CHECK_BYTES and len(body) < len(PLACEHOLDER_PREFIX):
+        try:
+            body = _read_page_markdown_body(p)
+        except FileNotFoundError:
+            return True
+
     if not body:
         return True
 
-    # Legacy placeholder used by some pipelines
-    if body.lower().startswith("(see attached image"):
+    if body.lower().startswith(PLACEHOLDER_PREFIX):
         return True
 
     return False
 
 
+# One joined read for the pages that still need OCR (instead of one blob
+# query per page). Bound in chunks to stay under SQLite's variable limit.
+PAGE_BLOBS_SQL = (
+    "SELECT p.page_order, b.bytes FROM pages p "
+    "LEFT JOIN blobs b ON b.owner_id = p.id AND b.ordinal = 0 "
+    "WHERE p.page_order IN ({}) ORDER BY p.page_order"
+)
+PAGE_BLOBS_CHUNK = 500
+
+
+def connect_ink(ink: Path) -> sqlite3.Connection:
+    """Open a .ink database read-only, with mmap'd page reads and a 64 MiB page cache.
+
+    Not immutable=1: Journal may still be writing the file (WAL), and
+    immutable would skip those pages.
+    """
+    con = sqlite3.connect(ink.resolve().as_uri() + "?mode=ro", uri=True)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA query_only=1")
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA temp_store=MEMORY")
+    return con
+
+
 def iter_pages(con: sqlite3.Connection):
     """Iterate over pages using an existing database connection."""
-    cur = con.cursor()
-    cur.execute("SELECT id, page_order FROM pages ORDER BY page_order")
-    for row in cur:
+    for row in con.execute("SELECT id, page_order FROM pages ORDER BY page_order"):
         yield row["id"], int(row["page_order"])
 
 
-def get_png_blob(con: sqlite3.Connection, page_id: bytes) -> bytes | None:
-    """Retrieve PNG blob using an existing database connection."""
+def iter_page_blobs(con: sqlite3.Connection, page_orders: list[int]):
+    """Yield (page_order, png_bytes | None) for *page_orders*, in page order."""
+    orders = sorted(page_orders)
+    # Plain tuples for this hot read, not the connection's sqlite3.Row.
     cur = con.cursor()
-    cur.execute("SELECT bytes FROM blobs WHERE owner_id = ? AND ordinal = 0", (page_id,))
-    r = cur.fetchone()
-    if not r or r[0] is None:
-        return None
-    b = bytes(r[0])
-    if b[:8] != PNG_MAGIC:
-        return None
-    return b
-
+    cur.row_factory = None
+    for i in range(0, len(orders), PAGE_BLOBS_CHUNK):
+        chunk = orders[i : i + PAGE_BLOBS_CHUNK]
+        sql = PAGE_BLOBS_SQL.format(",".join("?" * len(chunk)))
+        for order, b in cur.execute(sql, chunk):
+            # sqlite3 already returns BLOBs as bytes: check the magic through a
+            # memoryview and hand on that same object, without copying it.
+            if isinstance(b, bytes) and memoryview(b)[:8] == PNG_MAGIC:
+                yield int(order), b
+            else:
+                yield int(order), None
+
+
+OCR_CACHE_NAME = ".ocr_cache.sqlite"
+
+
+class OcrCache:
+    """Raw OCR text by PNG content hash, so an identical page image (re-export,
+    edited journal, copied pages) never goes back to the OCR service.
+
+    Shared by the journals exported side by side, so access is serialized.
+    """
+
+    def __init__(self, path: Path, engine_key: str) -> None:
+        self.engine_key = engine_key
+        self.con = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS ocr("
+            "hash BLOB NOT NULL, engine TEXT NOT NULL, text TEXT NOT NULL, mtime INTEGER, "
+            "PRIMARY KEY (hash, engine))"
+        )
 
-def write_outputs(doc_out: Path, page_order: int, text: str) -> None:
+    @staticmethod
+    def key(png: bytes) -> bytes:
+        # PNG content hash (BLAKE3 or md5; digest lengths differ, so keys
+        # from the two never collide).
+        return new_hasher(png).digest()
+
+    def get(self, key: bytes) -> str | None:
+        with self._lock:
+            row = self.con.execute(
+                "SELECT text FROM ocr WHERE hash=? AND engine=?", (key, self.engine_key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: bytes, text: str) -> None:
+        with self._lock, self.con:
+            self.con.execute(
+                "INSERT OR REPLACE INTO ocr(hash, engine, text, mtime) VALUES (?, ?, ?, ?)",
+                (key, self.engine_key, text, int(time.time())),
+            )
+
+    def close(self) -> None:
+        self.con.close()
+
+
+class _Batch:
+    """PNGs queued for one multi-page OCR request.
+
+    *singles* holds one ocr_png_bytes call per page once the batch request
+    has failed.
+    """
+
+    __slots__ = ("pngs", "future", "singles")
+
+    def __init__(self) -> None:
+        self.pngs: list[bytes] = []
+        self.future: Future[list[str]] | None = None
+        self.singles: list[Future[str]] | None = None
+
+
+def ocr_pages(
+    engine,
+    pages,
+    *,
+    executor: ThreadPoolExecutor,
+    window: int,
+    cache: OcrCache | None = None,
+    batch_size: int = 1,
+):
+    """Yield (page_order, text | None, error | None) for (page_order, png | None)
+    pairs, in order.
+
+    OCR is a network round trip per page, so several run at once on
+    *executor*; at most *window* pages (and their PNGs) are in flight, and
+    *pages* is consumed lazily on the calling thread (it may be a SQLite
+    cursor). With batch_size > 1, up to that many pages go out in one
+    ocr_png_bytes_batch request; if that request fails, its pages are
+    retried one per call, so a single bad page doesn't fail its neighbours.
+    A page whose OCR call raised is yielded with the exception, so one
+    failure doesn't discard the results already in flight.
+    Pages found in *cache* skip the OCR call; new results are added to it.
+    """
+    open_batch: _Batch | None = None
+
+    def submit(batch: _Batch) -> None:
+        nonlocal open_batch
+        batch.future = executor.submit(engine.ocr_png_bytes_batch, batch.pngs)
+        if batch is open_batch:
+            open_batch = None
+
+    def finish(item):
+        order, key, res = item
+        try:
+            if isinstance(res, Future):
+                text = res.result()
+            elif isinstance(res, tuple):
+                batch, idx = res
+                if batch.future is None:
+                    submit(batch)
+                try:
+                    text = batch.future.result()[idx]
+                except Exception:
+                    if batch.singles is None:
+                        batch.singles = [
+                            executor.submit(engine.ocr_png_bytes, png) for png in batch.pngs
+                        ]
+                    text = batch.singles[idx].result()
+            else:
+                return order, res, None
+        except Exception as e:
+            return order, None, e
+        # Empty results aren't cached, so a transient failure is retried.
+        if cache is not None and key is not None and text.strip():
+            cache.put(key, text)
+        return order, text, None
+
+    # res: None (no PNG) | str (cached) | Future (single) | (_Batch, index)
+    pending: deque[tuple[int, bytes | None, object]] = deque()
+    try:
+        for page_order, png in pages:
+            key = res = None
+            if png:
+                key = cache.key(png) if cache is not None else None
+                res = cache.get(key) if key is not None else None
+                if res is None and batch_size > 1:
+                    if open_batch is None:
+                        open_batch = _Batch()
+                    res = (open_batch, len(open_batch.pngs))
+                    open_batch.pngs.append(png)
+                    if len(open_batch.pngs) >= batch_size:
+                        submit(open_batch)
+                elif res is None:
+                    res = executor.submit(engine.ocr_png_bytes, png)
+            pending.append((page_order, key, res))
+            if len(pending) >= window:
+                yield finish(pending.popleft())
+        while pending:
+            yield finish(pending.popleft())
+    finally:
+        # Generator closed early: don't leave queued calls for pages nobody
+        # will write.
+        for _order, _key, res in pending:
+            if isinstance(res, Future):
+                res.cancel()
+            elif isinstance(res, tuple):
+                batch = res[0]
+                if batch.future is not None:
+                    batch.future.cancel()
+                for f in batch.singles or ():
+                    f.cancel()
+
+
+def write_outputs(doc_out: Path, page_order: int, text: str) -> str:
+    """Write the page export and return its contents."""
     # Canonical per-page export is Markdown only.
-    (doc_out / f"page_{page_order:04d}.md").write_text(f"# Page {page_order}\n\n{text}\n", encoding="utf-8")
+    md = f"# Page {page_order}\n\n{text}\n"
+    (doc_out / f"page_{page_order:04d}.md").write_text(md, encoding="utf-8")
+    return md
 
 
-def rebuild_combined(doc_out: Path) -> None:
-    parts_md: list[str] = []
+# Sidecar for combined.md: {"combined": [size, mtime_ns], "pages": [[name,
+# mtime_ns, size, offset, length], ...]}, offsets/lengths in bytes.
+COMBINED_INDEX = "combined.index.json"
 
-    for p in sorted(doc_out.glob("page_*.md")):
-        t = p.read_text(encoding="utf-8", errors="replace").strip()
+
+def _page_stats(doc_out: Path) -> list[tuple[str, int, int]]:
+    """(name, mtime_ns, size) for each page_*.md in doc_out, in name order."""
+    with os.scandir(doc_out) as it:
+        found = sorted(
+            (e.name, e) for e in it if e.name.startswith("page_") and e.name.endswith(".md")
+        )
+    out: list[tuple[str, int, int]] = []
+    for name, e in found:
+        try:
+            st = e.stat()
+        except FileNotFoundError:
+            continue
+        out.append((name, st.st_mtime_ns, st.st_size))
+    return out
+
+
+def _load_combined_index(doc_out: Path) -> list[list] | None:
+    """Return the recorded page spans, or None if combined.md doesn't match them."""
+    try:
+        idx = json.loads((doc_out / COMBINED_INDEX).read_text(encoding="utf-8"))
+        st = (doc_out / "combined.md").stat()
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if idx.get("combined") != [st.st_size, st.st_mtime_ns]:
+        return None
+    return idx.get("pages") or []
+
+
+def rebuild_combined(doc_out: Path, fresh: dict[str, str] | None = None) -> None:
+    """Write combined.md: every non-empty page, in order, blank-line separated.
+
+    combined.index.json records each page's stat and byte span in
+    combined.md, so only the tail from the first changed page onwards is
+    re-read and rewritten (one append when a page was added at the end).
+    *fresh* maps page file names to the contents just written for them, which
+    are used instead of reading those pages back from disk.
+    """
+    fresh = fresh or {}
+    combined = doc_out / "combined.md"
+    pages = _page_stats(doc_out)
+    old = _load_combined_index(doc_out)
+
+    keep = 0
+    end = 0
+    if old is not None:
+        for cur, prev in zip(pages, old):
+            if list(cur) != prev[:3]:
+                break
+            keep += 1
+            if prev[4]:
+                end = prev[3] + prev[4]
+        if keep == len(pages) == len(old):
+            return
+
+    entries = [list(e) for e in old[:keep]] if old is not None else []
+    parts: list[bytes] = []
+    pos = end
+    for name, mtime_ns, size in pages[keep:]:
+        if name in fresh:
+            # Same newline translation read_text() would have done.
+            t = fresh[name].replace("\r\n", "\n").replace("\r", "\n")
+        else:
+            t = (doc_out / name).read_text(encoding="utf-8", errors="replace")
+        t = t.strip().encode("utf-8")
         if not t:
+            entries.append([name, mtime_ns, size, pos, 0])
+            continue
+        if pos:
+            parts.append(b"\n\n")
+            pos += 2
+        entries.append([name, mtime_ns, size, pos, len(t)])
+        parts.append(t)
+        pos += len(t)
+    parts.append(b"\n")
+
+    with combined.open("r+b" if old is not None else "wb") as f:
+        f.seek(end)
+        f.truncate()
+        f.writelines(parts)
+
+    st = combined.stat()
+    (doc_out / COMBINED_INDEX).write_text(
+        json.dumps({"combined": [st.st_size, st.st_mtime_ns], "pages": entries}) + "\n",
+        encoding="utf-8",
+    )
+
+
+def _newest_export_mtime_ns(exports_base: Path) -> int:
+    """Newest mtime among doc dirs and their page markdown (what yearly/index read).
+
+    Doc dir mtimes cover pages that were added or removed.
+    """
+    newest = 0
+    with os.scandir(exports_base) as it:
+        docs = [e for e in it if e.is_dir() and e.name not in {"yearly", "index"}]
+    for doc in docs:
+        try:
+            newest = max(newest, doc.stat().st_mtime_ns)
+            with os.scandir(doc.path) as it:
+                for e in it:
+                    if e.name.endswith(".md") and e.name != "combined.md":
+                        newest = max(newest, e.stat().st_mtime_ns)
+        except FileNotFoundError:
             continue
-        parts_md.append(t + "\n")
+    return newest
+
+
+def _oldest_mtime_ns(paths) -> int:
+    """Oldest mtime among *paths*; 0 if there are none (so: stale)."""
+    oldest = None
+    for p in paths:
+        try:
+            m = p.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        oldest = m if oldest is None else min(oldest, m)
+    return oldest or 0
 
-    (doc_out / "combined.md").write_text("\n".join(parts_md).strip() + "\n", encoding="utf-8")
 
+# Per-doc record of the last complete export of a journal:
+# {"ink": [size, mtime_ns, wal_size, wal_mtime_ns], "pages": <page_*.md count>}.
+# Only written after a run that left no page failed or effectively empty, so
+# while the .ink (and its WAL) is unchanged and no export was removed, every
+# page has already been handled (including pages with no PNG) and the journal
+# DB isn't opened at all.
+EXPORT_STATE_NAME = ".export_state.json"
+
+
+def _ink_fingerprint(ink: Path) -> list[int]:
+    st = ink.stat()
+    try:
+        wal = os.stat(f"{ink}-wal")
+        wal_fp = [wal.st_size, wal.st_mtime_ns]
+    except FileNotFoundError:
+        wal_fp = [0, 0]
+    return [st.st_size, st.st_mtime_ns, *wal_fp]
 
-def main() -> None:
+
+def load_export_state(doc_out: Path) -> dict:
+    try:
+        obj = json.loads((doc_out / EXPORT_STATE_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def save_export_state(doc_out: Path, state: dict) -> None:
+    (doc_out / EXPORT_STATE_NAME).write_text(json.dumps(state) + "\n", encoding="utf-8")
+
+
+def _process_journal(
+    ink: Path,
+    doc_out: Path,
+    *,
+    engine,
+    corrections,
+    executor: ThreadPoolExecutor,
+    window: int,
+    cache: OcrCache | None,
+    batch_size: int,
+) -> tuple[int, int]:
+    """Export the new pages of one journal into doc_out; return (new, failed)."""
+    if not ink.exists():
+        print(f"SKIP missing: {ink}")
+        return 0, 0
+
+    total_new = 0
+    failed = 0
+
+    doc_out.mkdir(parents=True, exist_ok=True)
+    doc_state = load_doc_state(doc_out)
+    # One directory read instead of probing each page_XXXX.md.
+    with os.scandir(doc_out) as it:
+        existing = {e.name: e for e in it if e.name.startswith("page_") and e.name.endswith(".md")}
+
+    # Taken before reading, so a journal edited mid-run is looked at again.
+    ink_fp = _ink_fingerprint(ink)
+    export_state = load_export_state(doc_out)
+    if export_state.get("ink") == ink_fp and export_state.get("pages") == len(existing):
+        rebuild_combined(doc_out)
+        return 0, 0
+
+    # Contents of the pages written below, so rebuild_combined doesn't
+    # read them back.
+    fresh: dict[str, str] = {}
+    # Pages with a PNG whose OCR came back empty: exported as a bare heading,
+    # which _is_effectively_empty_page_export picks up for a retry next run.
+    retry = 0
+
+    # Use a single connection per journal file
+    with connect_ink(ink) as con:
+        # One read transaction for the page list and every blob read:
+        # a single snapshot (consistent even if Journal writes meanwhile)
+        # and one shared lock, instead of one per statement. The with
+        # block ends it.
+        con.execute("BEGIN")
+        # Decide which pages need OCR first (from the exports alone), so
+        # blobs are only read for those.
+        todo: list[int] = []
+        # Already exported as empty; not rewritten if still without a PNG.
+        empty: set[int] = set()
+        for _page_id, page_order in iter_pages(con):
+            entry = existing.get(f"page_{page_order:04d}.md")
+            if entry is None:
+                todo.append(page_order)
+                continue
+            out_md = Path(entry.path)
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                st = None
+            # Pages recorded in the corrections sidecar are known to have
+            # OCR text at this size/mtime; don't re-read them to check.
+            if st is not None and st.st_size > 0 and (
+                page_state_matches(doc_state, out_md, st)
+                or not _is_effectively_empty_page_export(out_md)
+            ):
+                continue
+            if st is not None and st.st_size == 0:
+                empty.add(page_order)
+            todo.append(page_order)
+
+        pages = iter_page_blobs(con, todo)
+        for page_order, text, err in ocr_pages(
+            engine,
+            pages,
+            executor=executor,
+            window=window,
+            cache=cache,
+            batch_size=batch_size,
+        ):
+            if err is not None:
+                # Leave the page unexported; the next run retries it.
+                failed += 1
+                print(f"FAIL {ink.name}: page {page_order:04d}: {err}")
+                continue
+            out_md = doc_out / f"page_{page_order:04d}.md"
+            if text is None:
+                # Leave an existing empty export (and its mtime) alone.
+                if page_order not in empty:
+                    out_md.write_text("", encoding="utf-8")
+                    fresh[out_md.name] = ""
+                continue
+
+            if not text.strip():
+                retry += 1
+            text = apply_corrections_compiled(text, corrections)
+
+            fresh[out_md.name] = write_outputs(doc_out, page_order, text)
+            total_new += 1
+            print(f"OK {ink.name}: page {page_order:04d}")
+
+    rebuild_combined(doc_out, fresh)
+    # Only a journal with every page OCR'd is recorded as done; otherwise the
+    # next run has to scan it again to retry the failed/empty pages.
+    if not failed and not retry:
+        save_export_state(doc_out, {"ink": ink_fp, "pages": len(existing.keys() | fresh.keys())})
+    return total_new, failed
+
+
+def _process_journals(inks: list[Path], doc_out: Path, **kwargs) -> tuple[int, int]:
+    """_process_journal for journals sharing doc_out, one after another."""
+    total_new = 0
+    failed = 0
+    for ink in inks:
+        new, fail = _process_journal(ink, doc_out, **kwargs)
+        total_new += new
+        failed += fail
+    return total_new, failed
+
+
+def _exit_if_failed(failed: int) -> None:
+    if failed:
+        raise SystemExit(f"OCR failed for {failed} page(s); they will be retried on the next run")
+
+
+def main(argv: list[str] | None = None) -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", required=True)
     ap.add_argument("--exports-base", required=True)
     ap.add_argument("--yearly-out", required=True)
     ap.add_argument("--index-db", required=True)
-    args = ap.parse_args()
+    ap.add_argument("--no-ocr-cache", action="store_true", help="Always call the OCR service.")
+    ap.add_argument(
+        "--skip-rebuild",
+        action="store_true",
+        help="Don't rebuild yearly exports / the index (the caller will do it afterwards).",
+    )
+    args = ap.parse_args(argv)
 
     cfg_path = Path(args.config)
     exports_base = Path(args.exports_base)
@@ -127,84 +612,104 @@ def main() -> None:
     corr_path = None
     if cfg.get("corrections_map"):
         corr_path = Path(str(cfg["corrections_map"])).expanduser().resolve()
+    # Parse + compile the map once, not once per OCR'd page.
+    corrections = load_corrections(corr_path)
 
     engine = build_engine(
         "azure",
         azure_language=str(cfg.get("azure_language", "en")),
         azure_timeout_s=int(cfg.get("azure_timeout_s", 180)),
+        azure_rps=float(cfg.get("azure_rps", 10)),
     )
+    concurrency = max(1, int(cfg.get("azure_concurrency", 8)))
+    # Pages per Read request (multi-page TIFF). Paid tier only: F0 reads just
+    # the first 2 pages of a document.
+    batch_size = max(1, int(cfg.get("azure_batch_pages", 1)))
 
     exports_base.mkdir(parents=True, exist_ok=True)
     yearly_out.mkdir(parents=True, exist_ok=True)
     index_db.parent.mkdir(parents=True, exist_ok=True)
 
-    total_new = 0
+    ocr_cache = None
+    if not args.no_ocr_cache:
+        # Keyed on the settings that change OCR output, not just the image.
+        ocr_cache = OcrCache(
+            exports_base / OCR_CACHE_NAME, f"azure:{cfg.get('azure_language', 'en')}"
+        )
+
+    # One pool for the whole run: worker threads (and their HTTP connections)
+    # are reused from one journal to the next. Journals are exported side by
+    # side, but all of them submit their OCR calls to this one pool, so at
+    # most *concurrency* requests are in flight overall.
+    executor = ThreadPoolExecutor(max_workers=concurrency)
 
+    # Journals that map to the same export dir are handled one after another.
+    groups: dict[Path, list[Path]] = {}
     for ink in journals:
         ink = ink.expanduser().resolve()
-        if not ink.exists():
-            print(f"SKIP missing: {ink}")
-            continue
-
-        doc_out = exports_base / slug(ink.stem)
-        doc_out.mkdir(parents=True, exist_ok=True)
-
-        # Use a single connection per journal file
-        with sqlite3.connect(str(ink)) as con:
-            con.row_factory = sqlite3.Row
-
-            for page_id, page_order in iter_pages(con):
-                out_md = doc_out / f"page_{page_order:04d}.md"
-                if out_md.exists() and out_md.stat().st_size > 0 and not _is_effectively_empty_page_export(out_md):
-                    continue
-
-                png = get_png_blob(con, page_id)
-                if not png:
-                    out_md.write_text("", encoding="utf-8")
-                    continue
-
-                text = engine.ocr_png_bytes(png)
-                text = apply_corrections(text, corr_path)
+        groups.setdefault(exports_base / slug(ink.stem), []).append(ink)
 
-                write_outputs(doc_out, page_order, text)
-                total_new += 1
-                print(f"OK {ink.name}: page {page_order:04d}")
-
-        rebuild_combined(doc_out)
+    journal_workers = max(1, min(int(cfg.get("journal_workers", 4)), len(groups)))
+    try:
+        with ThreadPoolExecutor(max_workers=journal_workers) as journal_ex:
+            futures = [
+                journal_ex.submit(
+                    _process_journals,
+                    inks,
+                    doc_out,
+                    engine=engine,
+                    corrections=corrections,
+                    executor=executor,
+                    window=2 * concurrency * batch_size,
+                    cache=ocr_cache,
+                    batch_size=batch_size,
+                )
+                for doc_out, inks in groups.items()
+            ]
+            try:
+                results = [f.result() for f in futures]
+            except BaseException:
+                # A journal raised: don't start the ones still queued, and
+                # drop their queued OCR calls.
+                for f in futures:
+                    f.cancel()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        executor.shutdown()
+        if ocr_cache is not None:
+            ocr_cache.close()
+    total_new = sum(new for new, _fail in results)
+    failed = sum(fail for _new, fail in results)
+
+    if args.skip_rebuild:
+        print(f"DONE: exported new_pages={total_new} (yearly/index rebuild skipped)")
+        _exit_if_failed(failed)
+        return
+
+    # Nothing new and no page touched (by this or any other script) since the
+    # yearly exports / index were last written: skip re-reading every page.
+    newest = _newest_export_mtime_ns(exports_base) if total_new == 0 else None
+    yearly_fresh = newest is not None and _oldest_mtime_ns(yearly_out.glob("journal-*.md")) > newest
+    index_fresh = newest is not None and _oldest_mtime_ns([index_db]) > newest
 
     # Rebuild yearly markdown
-    import runpy, sys
+    from build_index import run as run_index
+    from build_year_exports import run as run_yearly
 
-    original_argv = list(sys.argv)
-    try:
-        sys.argv = [
-            "build_year_exports.py",
-            "--exports-base",
-            str(exports_base),
-            "--out-dir",
-            str(yearly_out),
-        ]
-        runpy.run_path(
-            str(Path(__file__).resolve().parent / "build_year_exports.py"),
-            run_name="__main__",
-        )
+    if not yearly_fresh:
+        run_yearly(exports_base, yearly_out)
 
-        # Rebuild/update index
-        sys.argv = [
-            "build_index.py",
-            "--exports-base",
-            str(exports_base),
-            "--db",
-            str(index_db),
-        ]
-        runpy.run_path(
-            str(Path(__file__).resolve().parent / "build_index.py"),
-            run_name="__main__",
-        )
-    finally:
-        sys.argv = original_argv
+    # Rebuild/update index
+    if not index_fresh:
+        run_index(exports_base, index_db)
 
-    print(f"DONE: exported new_pages={total_new}")
+    print(
+        f"DONE: exported new_pages={total_new}"
+        + (" (yearly up to date)" if yearly_fresh else "")
+        + (" (index up to date)" if index_fresh else "")
+    )
+    _exit_if_failed(failed)
 
 
 if __name__ == "__main__":
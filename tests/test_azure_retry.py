@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+import requests
+
+from msjournal_reader.ocr import azure
+from msjournal_reader.ocr.azure import AzureVisionReadEngine
+
+
+def _response(status: int, retry_after: str | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    if retry_after is not None:
+        r.headers["Retry-After"] = retry_after
+    return r
+
+
+class _StubSession:
+    """Stands in for requests.Session: hands out canned responses in order."""
+
+    def __init__(self, responses: list[requests.Response]) -> None:
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    out: list[float] = []
+    monkeypatch.setattr(azure.time, "sleep", out.append)
+    return out
+
+
+def _engine(responses: list[requests.Response], max_retries: int = 5):
+    engine = AzureVisionReadEngine(
+        endpoint="https://example.invalid", key="k", rps=0, max_retries=max_retries
+    )
+    engine.session = _StubSession(responses)
+    return engine
+
+
+def test_request_honours_retry_after_within_bounds(sleeps: list[float]) -> None:
+    engine = _engine([_response(429, "120"), _response(429, "0"), _response(202)])
+
+    r = engine._request("POST", "https://example.invalid/read")
+
+    assert r.status_code == 202
+    assert engine.session.calls == 3
+    # Retry-After is clamped to [RETRY_MIN_S, RETRY_MAX_S].
+    assert sleeps == [60.0, 1.0]
+
+
+def test_request_returns_last_response_after_max_retries(sleeps: list[float]) -> None:
+    engine = _engine([_response(503), _response(503), _response(503)], max_retries=2)
+
+    r = engine._request("GET", "https://example.invalid/op")
+
+    assert r.status_code == 503
+    assert engine.session.calls == 3
+    # No Retry-After: exponential backoff from RETRY_MIN_S.
+    assert sleeps == [1.0, 2.0]
+
+
+def test_request_does_not_retry_other_errors(sleeps: list[float]) -> None:
+    engine = _engine([_response(400)])
+
+    r = engine._request("POST", "https://example.invalid/read")
+
+    assert r.status_code == 400
+    assert engine.session.calls == 1
+    assert sleeps == []
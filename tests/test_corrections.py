@@ -1,9 +1,20 @@
 from __future__ import annotations
 
 import json
+import re
+import sys
 from pathlib import Path
 
-from msjournal_reader.corrections import apply_corrections
+from msjournal_reader.corrections import (
+    _WordTable,
+    apply_corrections,
+    apply_corrections_compiled,
+    load_corrections,
+)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import review_queue  # noqa: E402
 
 
 def test_apply_corrections_dict_word_boundaries(tmp_path: Path) -> None:
@@ -33,3 +44,61 @@ def test_apply_corrections_missing_file_is_noop(tmp_path: Path) -> None:
     missing = tmp_path / "nope.json"
     text = "hello"
     assert apply_corrections(text, missing) == text
+
+
+def test_load_corrections_matches_apply_corrections(tmp_path: Path) -> None:
+    rules = [[r"\bjulz\b", "Jules"], ["abc", "x"]]
+    p = tmp_path / "rules.json"
+    p.write_text(json.dumps(rules), encoding="utf-8")
+
+    compiled = load_corrections(p)
+    text = "JULZ was tered; abc"
+    assert apply_corrections_compiled(text, compiled) == apply_corrections(text, p)
+    assert apply_corrections_compiled(text, compiled) == "Jules was tired; x"
+
+
+def test_word_rules_single_pass_matches_rule_by_rule(tmp_path: Path) -> None:
+    # Whole-word rules are folded into one lookup pass; cascades between them
+    # (julz -> jules -> Jules) and duplicates must still behave as ordered.
+    rules = [
+        [r"\bjulz\b", "jules"],
+        [r"\bteh\b", "the"],
+        [r"\bjules\b", "Jules"],
+        [r"\bJULZ\b", "nope"],
+        [r"\bo+k\b", "ok"],
+        [r"\bwaht\b", "what"],
+    ]
+    p = tmp_path / "rules.json"
+    p.write_text(json.dumps(rules), encoding="utf-8")
+
+    text = "teh julz said waht? ooook, Julz's teh-julz"
+    expected = text
+    for patt, repl in rules:
+        expected = re.sub(patt, repl, expected, flags=re.IGNORECASE)
+
+    out = apply_corrections_compiled(text, load_corrections(p))
+    assert out == expected
+    assert out == "the Jules said what? ok, Jules's the-Jules"
+
+
+def test_load_corrections_reloads_changed_map(tmp_path: Path) -> None:
+    p = tmp_path / "map.json"
+    p.write_text(json.dumps({"cat": "dog"}), encoding="utf-8")
+    assert apply_corrections_compiled("cat", load_corrections(p)) == "dog"
+    assert load_corrections(p) is load_corrections(p)
+
+    p.write_text(json.dumps({"cat": "mouse"}), encoding="utf-8")
+    assert apply_corrections_compiled("cat", load_corrections(p)) == "mouse"
+
+
+def test_review_queue_rules_rewrite_text(tmp_path: Path) -> None:
+    corrections: list = []
+    review_queue.append_regex_rule(corrections, "julz", "Jules")
+    review_queue.append_regex_rule(corrections, "waht", "what")
+    p = tmp_path / "regex_corrections.json"
+    review_queue.save_json(p, corrections)
+
+    compiled = load_corrections(p)
+    assert apply_corrections_compiled("Julz said waht?", compiled) == "Jules said what?"
+    # Whole-word rules take the single-pass lookup path.
+    assert any(isinstance(step, _WordTable) for step in compiled.steps)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from msjournal_reader.ocr.ratelimit import TokenBucket
+
+
+def test_token_bucket_spaces_calls_after_burst() -> None:
+    bucket = TokenBucket(rate_per_sec=50, burst=2)
+
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # Two calls from the burst, then one every 1/50 s for the other three.
+    assert elapsed >= 3 / 50 * 0.9
+
+
+def test_token_bucket_rejects_non_positive_rate() -> None:
+    with pytest.raises(ValueError):
+        TokenBucket(rate_per_sec=0)
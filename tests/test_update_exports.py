@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from msjournal_reader.corrections import load_corrections
+from msjournal_reader.ink import PNG_MAGIC
+from msjournal_reader.ocr.base import OcrEngine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import update_exports  # noqa: E402
+
+
+class _StubEngine(OcrEngine):
+    """Echoes each "PNG" back as text; pages in *bad* always raise."""
+
+    name = "stub"
+
+    def __init__(self, bad: set[bytes] = frozenset(), empty: set[bytes] = frozenset()) -> None:
+        self.bad = bad
+        self.empty = empty
+        self.single: list[bytes] = []
+        self.batches: list[list[bytes]] = []
+        self._lock = threading.Lock()
+
+    def ocr_png_bytes(self, png_bytes: bytes) -> str:
+        with self._lock:
+            self.single.append(png_bytes)
+        if png_bytes in self.bad:
+            raise ValueError("unreadable page")
+        if png_bytes in self.empty:
+            return ""
+        return f"text of {png_bytes.removeprefix(PNG_MAGIC).decode()}\n"
+
+    def ocr_png_bytes_batch(self, pngs: list[bytes]) -> list[str]:
+        with self._lock:
+            self.batches.append(list(pngs))
+        if self.bad.intersection(pngs):
+            raise ValueError("batch rejected")
+        return [f"text of {p.decode()}\n" for p in pngs]
+
+
+def _ocr(engine: _StubEngine, pages, **kwargs) -> list:
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        return list(update_exports.ocr_pages(engine, iter(pages), executor=ex, window=4, **kwargs))
+
+
+def test_ocr_pages_isolates_a_failing_page_in_a_batch(tmp_path: Path) -> None:
+    pages = [(i, f"p{i}".encode()) for i in range(1, 6)] + [(6, None)]
+    cache = update_exports.OcrCache(tmp_path / "ocr.sqlite", "stub")
+    try:
+        engine = _StubEngine(bad={b"p4"})
+        out = _ocr(engine, pages, cache=cache, batch_size=2)
+
+        assert [order for order, _text, _err in out] == [1, 2, 3, 4, 5, 6]
+        assert sorted(engine.batches) == [[b"p1", b"p2"], [b"p3", b"p4"], [b"p5"]]
+        # Only the failed batch is retried page by page; its good page survives.
+        assert sorted(engine.single) == [b"p3", b"p4"]
+        assert [text for _order, text, _err in out] == [
+            "text of p1\n",
+            "text of p2\n",
+            "text of p3\n",
+            None,
+            "text of p5\n",
+            None,
+        ]
+        assert isinstance(out[3][2], ValueError)
+
+        # Second run: every page that was OCR'd comes from the cache.
+        engine = _StubEngine(bad={b"p4"})
+        out = _ocr(engine, pages, cache=cache, batch_size=2)
+        assert engine.batches == [[b"p4"]]
+        assert engine.single == [b"p4"]
+        assert [text for _order, text, _err in out] == [
+            "text of p1\n",
+            "text of p2\n",
+            "text of p3\n",
+            None,
+            "text of p5\n",
+            None,
+        ]
+    finally:
+        cache.close()
+
+
+def _png(order: int) -> bytes:
+    return PNG_MAGIC + f"page{order}".encode()
+
+
+def _add_pages(ink: Path, orders) -> None:
+    con = sqlite3.connect(str(ink))
+    with con:
+        con.execute("CREATE TABLE IF NOT EXISTS pages (id BLOB PRIMARY KEY, page_order INTEGER)")
+        con.execute("CREATE TABLE IF NOT EXISTS blobs (owner_id BLOB, ordinal INTEGER, bytes BLOB)")
+        for order in orders:
+            page_id = order.to_bytes(16, "big")
+            con.execute("INSERT INTO pages (id, page_order) VALUES (?, ?)", (page_id, order))
+            con.execute(
+                "INSERT INTO blobs (owner_id, ordinal, bytes) VALUES (?, ?, ?)",
+                (page_id, 0, _png(order)),
+            )
+    con.close()
+
+
+@pytest.fixture
+def ink_opens(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    opened: list[Path] = []
+    connect = update_exports.connect_ink
+
+    def counting_connect(ink: Path):
+        opened.append(ink)
+        return connect(ink)
+
+    monkeypatch.setattr(update_exports, "connect_ink", counting_connect)
+    return opened
+
+
+def _export(ink: Path, doc_out: Path, engine: _StubEngine) -> tuple[int, int]:
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        return update_exports._process_journal(
+            ink,
+            doc_out,
+            engine=engine,
+            corrections=load_corrections(None),
+            executor=ex,
+            window=4,
+            cache=None,
+            batch_size=1,
+        )
+
+
+def _combined_from_scratch(doc_out: Path) -> bytes:
+    incremental = (doc_out / "combined.md").read_bytes()
+    (doc_out / "combined.md").unlink()
+    (doc_out / update_exports.COMBINED_INDEX).unlink()
+    update_exports.rebuild_combined(doc_out)
+    assert (doc_out / "combined.md").read_bytes() == incremental
+    return incremental
+
+
+def test_process_journal_skips_unchanged_ink(tmp_path: Path, ink_opens: list[Path]) -> None:
+    ink = tmp_path / "j.ink"
+    doc_out = tmp_path / "out"
+    _add_pages(ink, [1, 2, 3])
+
+    assert _export(ink, doc_out, _StubEngine()) == (3, 0)
+    assert (doc_out / update_exports.EXPORT_STATE_NAME).exists()
+
+    engine = _StubEngine()
+    assert _export(ink, doc_out, engine) == (0, 0)
+    assert len(ink_opens) == 1  # second run didn't open the journal
+    assert engine.single == []
+
+    # A page added to the journal: only it is OCR'd, and combined.md is
+    # extended in place to what a full rebuild would write.
+    _add_pages(ink, [4])
+    assert _export(ink, doc_out, engine) == (1, 0)
+    assert engine.single == [_png(4)]
+    assert b"text of page4" in _combined_from_scratch(doc_out)
+
+
+def test_process_journal_rescans_after_export_deleted(
+    tmp_path: Path, ink_opens: list[Path]
+) -> None:
+    ink = tmp_path / "j.ink"
+    doc_out = tmp_path / "out"
+    _add_pages(ink, [1, 2, 3])
+    _export(ink, doc_out, _StubEngine())
+
+    (doc_out / "page_0002.md").unlink()
+    engine = _StubEngine()
+    assert _export(ink, doc_out, engine) == (1, 0)
+    assert len(ink_opens) == 2
+    assert engine.single == [_png(2)]
+    assert b"text of page2" in _combined_from_scratch(doc_out)
+
+
+@pytest.mark.parametrize("outcome", ["bad", "empty"])
+def test_process_journal_no_state_until_every_page_has_text(
+    tmp_path: Path, ink_opens: list[Path], outcome: str
+) -> None:
+    ink = tmp_path / "j.ink"
+    doc_out = tmp_path / "out"
+    state = doc_out / update_exports.EXPORT_STATE_NAME
+    _add_pages(ink, [1, 2, 3])
+
+    new, failed = _export(ink, doc_out, _StubEngine(**{outcome: {_png(2)}}))
+    assert (new, failed) == ((2, 1) if outcome == "bad" else (3, 0))
+    assert not state.exists()
+
+    # The next run opens the journal again and retries just that page.
+    engine = _StubEngine()
+    assert _export(ink, doc_out, engine) == (1, 0)
+    assert len(ink_opens) == 2
+    assert engine.single == [_png(2)]
+    assert state.exists()